@@ -1,22 +1,245 @@
 """FastAPI Backend for U-Boat Game"""
 
-from fastapi import FastAPI, HTTPException
+from fastapi import (
+    FastAPI,
+    HTTPException,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.websockets import WebSocketState
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, ValidationError, model_validator
+from functools import partial
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import logging
+import secrets
 import sys
 import os
+import threading
+import time
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from uboat_game.core import run_simulations
+from uboat_game import metrics
+from uboat_game.adaptive import run_until_precision
+from uboat_game.cache import ResultCache
+from uboat_game.charts import FORMATS, KINDS, MEDIA_TYPES, ChartRenderer
+from uboat_game.core import resolve_engine
+from uboat_game.encoding import encode_json
+from uboat_game.jobs import COMPLETED, JobManager
+from uboat_game.offload import ComputePool, Overloaded
+from uboat_game.parallel import shutdown_pools
+from uboat_game.rules import GameRules
+from uboat_game.rooms import RoomHub
+from uboat_game.sessions import ROLLING, GameStateError, SessionStore
+from uboat_game.stats import HitAccumulator
+from uboat_game.strategy import score_table
+from uboat_game.warmup import warm_up
 from uboat_game.simulator import (
     calculate_theoretical_probabilities,
     compare_experimental_vs_theoretical,
 )
 
-app = FastAPI(title="U-Boat Game API", version="1.0.0")
+
+class TimedJSONResponse(JSONResponse):
+    """
+    JSONResponse encoded with encode_json (orjson when installed), recording
+    its encoding time as the serialization stage
+    """
+
+    def render(self, content) -> bytes:
+        with metrics.STAGE_SECONDS.time(stage="serialization"):
+            return encode_json(content)
+
+
+app = FastAPI(
+    title="U-Boat Game API",
+    version="1.0.0",
+    default_response_class=TimedJSONResponse,
+)
+
+# Same ceiling as a fixed-size request
+ADAPTIVE_MAX_RUNS = 1000000
+
+# Work ceiling for one request: runs x rolls (10^6 standard games = 5 * 10^6)
+MAX_REQUEST_ROLLS = 50000000
+
+# Work ceiling for one job: runs x rolls (10^9 standard games)
+MAX_JOB_ROLLS = 100 * MAX_REQUEST_ROLLS
+
+# Most prediction rows in one strategy response; larger boards must ask for
+# the best `top` predictions
+MAX_STRATEGY_ROWS = 1000
+
+result_cache = ResultCache(
+    maxsize=int(os.environ.get("UBOAT_CACHE_SIZE", 256)),
+    ttl=float(os.environ.get("UBOAT_CACHE_TTL", 600)),
+)
+
+session_store = SessionStore(
+    max_sessions=int(os.environ.get("UBOAT_MAX_SESSIONS", 50000)),
+    ttl=float(os.environ.get("UBOAT_SESSION_TTL", 1800)),
+)
+
+room_hub = RoomHub()
+
+chart_renderer = ChartRenderer(
+    maxsize=int(os.environ.get("UBOAT_CHART_CACHE_SIZE", 128)),
+    ttl=float(os.environ.get("UBOAT_CHART_CACHE_TTL", 3600)),
+)
+
+# Simulations run on this many worker processes, with at most
+# UBOAT_MAX_QUEUE more requests waiting; beyond that requests get a 503
+compute_pool = ComputePool(
+    workers=int(os.environ.get("UBOAT_COMPUTE_WORKERS", os.cpu_count() or 1)),
+    max_queue=int(os.environ.get("UBOAT_MAX_QUEUE", 32)),
+)
+
+# Jobs simulate block by block on compute_pool, at most UBOAT_JOB_WORKERS at
+# once; beyond UBOAT_MAX_JOBS queued or running jobs new ones get a 503
+job_manager = JobManager(
+    compute_pool,
+    max_running=int(os.environ.get("UBOAT_JOB_WORKERS", 2)),
+    max_jobs=int(os.environ.get("UBOAT_MAX_JOBS", 16)),
+    result_ttl=float(os.environ.get("UBOAT_JOB_TTL", 3600)),
+    # uvicorn's own logger already has a handler, so job progress lines
+    # show up in the server log without extra logging set-up
+    logger=logging.getLogger("uvicorn.error"),
+)
+
+# Responses that only depend on their parameters may be cached this long
+IMMUTABLE_MAX_AGE = 86400
+
+# Responses smaller than this are sent uncompressed
+GZIP_MIN_SIZE = 1024
+
+# Seconds a simulation request may take, queueing included
+REQUEST_TIMEOUT = float(os.environ.get("UBOAT_REQUEST_TIMEOUT", 60))
+
+# What asyncio.wait_for and Future.result raise on timeout; both are the
+# built-in TimeoutError only from Python 3.11 on
+TIMEOUT_ERRORS = (asyncio.TimeoutError, concurrent.futures.TimeoutError)
+
+# Engines, caches and the process pool are warmed in the background at
+# start-up; /api/ready reports 503 until that is done
+WARMUP = os.environ.get("UBOAT_WARMUP", "1") != "0"
+readiness = {"ready": not WARMUP, "warmup": None, "error": None}
+
+REQUEST_SECONDS = metrics.REGISTRY.register(
+    metrics.Histogram("uboat_http_request_seconds", "HTTP request latency")
+)
+IN_FLIGHT_REQUESTS = metrics.REGISTRY.register(
+    metrics.Gauge("uboat_http_requests_in_flight", "HTTP requests being handled")
+)
+metrics.REGISTRY.register(
+    metrics.GaugeFunc(
+        "uboat_jobs_in_flight", "Queued or running jobs", job_manager.active_count
+    )
+)
+metrics.REGISTRY.register(
+    metrics.GaugeFunc(
+        "uboat_game_sessions", "Live game sessions", session_store.__len__
+    )
+)
+metrics.REGISTRY.register(
+    metrics.GaugeFunc(
+        "uboat_websocket_connections",
+        "Open game WebSocket connections",
+        lambda: room_hub.connection_count,
+    )
+)
+metrics.REGISTRY.register(
+    metrics.GaugeFunc(
+        "uboat_cache_hit_ratio",
+        "Share of cacheable requests served without a new computation",
+        lambda: result_cache.stats()["hit_ratio"],
+    )
+)
+metrics.REGISTRY.register(
+    metrics.GaugeFunc(
+        "uboat_cache_entries", "Cached results", lambda: result_cache.stats()["size"]
+    )
+)
+metrics.REGISTRY.register(
+    metrics.GaugeFunc(
+        "uboat_compute_queued",
+        "Simulation requests waiting for a worker",
+        lambda: compute_pool.stats()["queued"],
+    )
+)
+metrics.REGISTRY.register(
+    metrics.CounterFunc(
+        "uboat_compute_rejected_total",
+        "Simulation requests turned away with 503 since start",
+        lambda: compute_pool.rejected,
+    )
+)
+metrics.REGISTRY.register(
+    metrics.GaugeFunc(
+        "uboat_chart_cache_hit_ratio",
+        "Share of chart requests served without rendering",
+        lambda: chart_renderer.cache.stats()["hit_ratio"],
+    )
+)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records latency and in-flight count of HTTP requests.
+
+    Plain ASGI rather than BaseHTTPMiddleware: with metrics off a request
+    costs one flag check, and the response body is streamed through as is.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not metrics.ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT_REQUESTS.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            IN_FLIGHT_REQUESTS.dec()
+            # Route templates keep the label set small (/api/jobs/{job_id})
+            route = scope.get("route")
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                path=route.path if route else "unmatched",
+                status=status,
+            )
+
+
+app.add_middleware(RequestMetricsMiddleware)
 
 # CORS
 app.add_middleware(
@@ -25,16 +248,205 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE)
+
+
+class RulesModel(BaseModel):
+    rows: int = Field(2, ge=1, le=1000, description="Board rows")
+    cols: int = Field(3, ge=1, le=1000, description="Board columns")
+    rolls: int = Field(5, ge=1, le=10000, description="Sonar rolls per game")
+    reroll: bool = Field(False, description="Re-roll squares already hit")
+    points: List[int] = Field(
+        [4, 2, 1],
+        min_length=1,
+        max_length=100,
+        description="Points for a miss of 0, 1, 2...",
+    )
+
+    @model_validator(mode="after")
+    def check_rules(self):
+        self.to_rules()
+        return self
+
+    def to_rules(self) -> GameRules:
+        return GameRules(**self.model_dump())
 
 
 class SimulationRequest(BaseModel):
-    runs: int = Field(ge=1, le=1000000, description="Number of simulations")
+    runs: Optional[int] = Field(
+        None, ge=1, le=1000000, description="Number of simulations"
+    )
+    precision: Optional[float] = Field(
+        None,
+        gt=0,
+        lt=1,
+        description="Instead of runs: target CI half-width for mean and buckets",
+    )
+    relative_error: Optional[float] = Field(
+        None, gt=0, lt=1, description="Instead of runs: target relative CI width"
+    )
+    confidence: float = Field(0.95, gt=0, lt=1, description="CI confidence level")
+    workers: int = Field(1, ge=1, le=64, description="Worker processes")
+    seed: Optional[int] = Field(
+        None, ge=0, description="Seed for a reproducible simulation"
+    )
+    rules: RulesModel = Field(default_factory=RulesModel, description="Game rules")
+
+    @model_validator(mode="after")
+    def check_stopping_rule(self):
+        adaptive = self.precision is not None or self.relative_error is not None
+        if (self.runs is None) == (not adaptive):
+            raise ValueError("give either runs or precision/relative_error")
+        if self.runs is not None and self.runs * self.rules.rolls > MAX_REQUEST_ROLLS:
+            raise ValueError(
+                f"runs x rolls must be at most {MAX_REQUEST_ROLLS}; use /api/jobs"
+            )
+        return self
+
+
+class JobRequest(BaseModel):
+    runs: int = Field(ge=1, le=1000000000, description="Number of simulations")
+    seed: Optional[int] = Field(None, ge=0, description="Seed for the job")
+    rules: RulesModel = Field(default_factory=RulesModel, description="Game rules")
+
+    @model_validator(mode="after")
+    def check_work(self):
+        if self.runs * self.rules.rolls > MAX_JOB_ROLLS:
+            raise ValueError(f"runs x rolls must be at most {MAX_JOB_ROLLS}")
+        return self
+
+
+class StrategyRequest(BaseModel):
+    rules: RulesModel = Field(default_factory=RulesModel, description="Game rules")
+    probabilities: Optional[Dict[int, float]] = Field(
+        None,
+        description="Hit distribution {hits: p}, e.g. from a simulation "
+        "(default: the exact distribution)",
+    )
+    top: Optional[int] = Field(
+        None,
+        ge=1,
+        le=MAX_STRATEGY_ROWS,
+        description="Only the best N predictions (default: all, on boards of "
+        f"at most {MAX_STRATEGY_ROWS} squares)",
+    )
+
+    @model_validator(mode="after")
+    def check_size(self):
+        if self.top is None and self.rules.rows * self.rules.cols > MAX_STRATEGY_ROWS:
+            raise ValueError(
+                f"board has over {MAX_STRATEGY_ROWS} predictions; give top"
+            )
+        return self
+
+
+class GameRequest(BaseModel):
+    players: List[str] = Field(
+        min_length=1, max_length=10, description="Player names in turn order"
+    )
+    rounds: int = Field(5, ge=1, le=100, description="Rounds to play")
+    rules: RulesModel = Field(default_factory=RulesModel, description="Game rules")
+
+
+class PredictionRequest(BaseModel):
+    player: int = Field(ge=0, description="Player index in the players list")
+    prediction: int = Field(description="Predicted hits for this round")
+
+
+class StatisticsModel(BaseModel, extra="allow"):
+    n_simulations: int
+    hit_distribution: Dict[int, int]
+    mean_hits: float
+    median_hits: Optional[int]
+    mode_hits: Optional[int]
+    std_dev: float
+    probabilities: Dict[int, float]
+
+
+class ComparisonModel(BaseModel):
+    experimental: Dict[int, float]
+    theoretical: Dict[int, float]
+    n_simulations: int
 
 
 class SimulationResponse(BaseModel):
-    statistics: dict
-    comparison: dict
+    statistics: StatisticsModel
+    comparison: ComparisonModel
+
+
+class CompactSimulationResponse(BaseModel):
+    """
+    SimulationResponse with arrays indexed by hit count instead of dicts.
+
+    Probabilities follow from histogram / n_simulations, so they are left
+    out; the response is a fraction of the size and cheaper to encode.
+    """
+
+    n_simulations: int
+    histogram: List[int] = Field(description="Games per hit count 0..max_hits")
+    mean_hits: float
+    median_hits: Optional[int]
+    mode_hits: Optional[int]
+    std_dev: float
+    theoretical: List[float] = Field(description="Probability of 0..max_hits hits")
+    precision: Optional[dict] = Field(None, description="Adaptive runs only")
+
+
+def _compact(result: dict, max_hits: int) -> dict:
+    stats = result["statistics"]
+    histogram = [0] * (max_hits + 1)
+    for hits, count in stats["hit_distribution"].items():
+        histogram[hits] = count
+    theoretical = [0.0] * (max_hits + 1)
+    for hits, p in result["comparison"]["theoretical"].items():
+        theoretical[hits] = p
+    return {
+        "n_simulations": stats["n_simulations"],
+        "histogram": histogram,
+        "mean_hits": stats["mean_hits"],
+        "median_hits": stats["median_hits"],
+        "mode_hits": stats["mode_hits"],
+        "std_dev": stats["std_dev"],
+        "theoretical": theoretical,
+        "precision": stats.get("precision"),
+    }
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match lists etag (weak comparison, as for GET)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def _cacheable_response(
+    request: Request,
+    body: bytes,
+    media_type: str = "application/json",
+    max_age: int = IMMUTABLE_MAX_AGE,
+) -> Response:
+    """
+    Response with an ETag of its body and Cache-Control headers.
+
+    max_age suits content fully determined by the request; with max_age=0
+    clients must revalidate every time. The ETag is weak because GZip may
+    re-encode the body. A conditional GET whose If-None-Match still
+    matches gets an empty 304.
+    """
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+    headers = {
+        "ETag": f'W/"{etag}"',
+        "Cache-Control": (f"public, max-age={max_age}" if max_age else "no-cache"),
+    }
+    if request.method in ("GET", "HEAD") and _etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
 
 
 @app.get("/")
@@ -42,25 +454,580 @@ def root():
     return {"message": "U-Boat Game API", "version": "1.0.0"}
 
 
-@app.post("/api/simulate", response_model=SimulationResponse)
-def simulate_game(request: SimulationRequest):
-    """Run N simulations and return statistics"""
+async def _simulate(request: SimulationRequest) -> dict:
+    rules = request.rules.to_rules()
+    if request.runs is None:
+        stats = await compute_pool.call(
+            partial(
+                run_until_precision,
+                half_width=request.precision,
+                relative_error=request.relative_error,
+                confidence=request.confidence,
+                max_runs=min(ADAPTIVE_MAX_RUNS, MAX_REQUEST_ROLLS // rules.rolls),
+                seed=request.seed,
+                rules=rules,
+            )
+        )
+    else:
+        # request.workers is how many of the pool's processes may work on
+        # this run at once
+        stats = await compute_pool.simulate(
+            request.runs, request.seed, rules=rules, window=request.workers
+        )
+    comparison = await run_in_threadpool(
+        compare_experimental_vs_theoretical,
+        stats["n_simulations"],
+        experimental=stats,
+        rules=rules,
+    )
+    return {"statistics": stats, "comparison": comparison}
+
+
+def _unavailable(e: Overloaded) -> HTTPException:
+    """503 with Retry-After for a request the server is too busy to take"""
+    return HTTPException(
+        status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+    )
+
+
+async def _admitted(compute: Callable[[], Awaitable]):
+    """compute() holding a compute slot, under the request timeout"""
+
+    async def run():
+        async with compute_pool.admit():
+            return await compute()
+
+    return await asyncio.wait_for(run(), REQUEST_TIMEOUT)
+
+
+async def _client_gone(request: Request):
+    # Once the body has been read, the next ASGI message is the disconnect
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _unless_disconnected(request: Request, work: Awaitable):
+    """Await work, cancelling it if the client disconnects first"""
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(_client_gone(request))
     try:
-        stats = run_simulations(request.runs)
-        comparison = compare_experimental_vs_theoretical(request.runs)
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if not task.done():
+            raise HTTPException(status_code=499, detail="Client closed request")
+        return task.result()
+    finally:
+        task.cancel()
+        watcher.cancel()
 
-        # Remove raw results to reduce response size
-        stats.pop("raw_results", None)
 
-        return {"statistics": stats, "comparison": comparison}
+async def _simulation_result(
+    request: SimulationRequest, http_request: Request, compact: bool
+) -> dict:
+    """Run (or fetch from the cache) one simulation request's result"""
+    compute = partial(_admitted, partial(_simulate, request))
+    try:
+        if request.seed is None:
+            work = compute()
+        else:
+            # Seeded runs are deterministic: serve repeats from the cache and
+            # let concurrent identical requests share one computation. Workers
+            # do not change the result, so they are left out of the key; the
+            # rules are part of it.
+            key = json.dumps(request.model_dump(exclude={"workers"}), sort_keys=True)
+            work = result_cache.get_or_compute_async(key, compute)
+        result = await _unless_disconnected(http_request, work)
+    except Overloaded as e:
+        raise _unavailable(e)
+    except TIMEOUT_ERRORS:
+        raise HTTPException(
+            status_code=504,
+            detail=f"simulation took over {REQUEST_TIMEOUT:g}s; use /api/jobs",
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if compact:
+        result = _compact(result, request.rules.to_rules().max_hits)
+    return result
+
+
+@app.post(
+    "/api/simulate",
+    response_model=Union[SimulationResponse, CompactSimulationResponse],
+)
+async def simulate_game(
+    request: SimulationRequest,
+    http_request: Request,
+    compact: bool = Query(False, description="Arrays instead of dicts"),
+):
+    """
+    Run N simulations and return statistics.
+
+    The games are simulated on the compute process pool. A full queue gives
+    503 with Retry-After, a run over the request timeout 504, and a client
+    that disconnects cancels its run. Seeded runs are cached on the server;
+    GET /api/simulate serves them with HTTP caching headers as well.
+    """
+    result = await _simulation_result(request, http_request, compact)
+    # The result dicts are built by this module, so they are encoded
+    # directly rather than validated against the response model first
+    return TimedJSONResponse(result, headers={"Cache-Control": "no-store"})
+
+
+@app.get(
+    "/api/simulate",
+    response_model=Union[SimulationResponse, CompactSimulationResponse],
+)
+async def get_seeded_simulation(
+    http_request: Request,
+    seed: int = Query(ge=0, description="Seed; the result depends only on it"),
+    runs: Optional[int] = Query(None, description="Number of simulations"),
+    precision: Optional[float] = Query(None, description="Instead of runs"),
+    relative_error: Optional[float] = Query(None, description="Instead of runs"),
+    confidence: float = Query(0.95, description="CI confidence level"),
+    rows: int = Query(2, description="Board rows"),
+    cols: int = Query(3, description="Board columns"),
+    rolls: int = Query(5, description="Sonar rolls per game"),
+    reroll: bool = Query(False, description="Re-roll squares already hit"),
+    compact: bool = Query(False, description="Arrays instead of dicts"),
+):
+    """
+    A seeded simulation as a cacheable GET.
+
+    Takes the fields of a POST /api/simulate body as query parameters
+    (standard points table). The result is fully determined by them, so it
+    carries an ETag and a long Cache-Control max-age, and a conditional GET
+    whose If-None-Match still matches gets an empty 304.
+    """
+    try:
+        request = SimulationRequest(
+            runs=runs,
+            precision=precision,
+            relative_error=relative_error,
+            confidence=confidence,
+            seed=seed,
+            rules=RulesModel(rows=rows, cols=cols, rolls=rolls, reroll=reroll),
+        )
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    result = await _simulation_result(request, http_request, compact)
+    with metrics.STAGE_SECONDS.time(stage="serialization"):
+        body = encode_json(result)
+    return _cacheable_response(http_request, body)
+
+
+def _progress(accumulator: HitAccumulator, runs: int) -> dict:
+    return {
+        "completed": accumulator.count,
+        "percent": 100.0 * accumulator.count / runs,
+        "statistics": accumulator.to_statistics(),
+    }
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {encode_json(data).decode()}\n\n"
+
+
+@app.get("/api/simulate/stream")
+async def stream_simulation(
+    request: Request,
+    runs: int = Query(ge=1, le=100000000, description="Number of simulations"),
+    seed: Optional[int] = Query(None, ge=0, description="Seed for the run"),
+    every: int = Query(10000, ge=100, le=1000000, description="Games per event"),
+    rows: int = Query(2, ge=1, le=1000, description="Board rows"),
+    cols: int = Query(3, ge=1, le=1000, description="Board columns"),
+    rolls: int = Query(5, ge=1, le=10000, description="Sonar rolls per game"),
+    reroll: bool = Query(False, description="Re-roll squares already hit"),
+):
+    """
+    Stream the converging hit distribution as Server-Sent Events.
+
+    A "start" event is sent at once, then a "progress" event with the running
+    statistics after every `every` games and a final "done" event. The
+    stream is reproducible for the same (runs, seed, every). Simulation stops
+    as soon as the client disconnects.
+    """
+    try:
+        rules = GameRules(rows, cols, rolls, reroll)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    # Same work ceiling as POST /api/simulate: a stream holds a compute slot
+    # for its whole run
+    if runs * rules.rolls > MAX_REQUEST_ROLLS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"runs x rolls must be at most {MAX_REQUEST_ROLLS}; use /api/jobs",
+        )
+    if seed is None:
+        seed = secrets.randbits(64)
+    try:
+        # Refuse before the response starts; admit() below may still find
+        # the queue filled up in the meantime and report that as an event
+        compute_pool.check()
+    except Overloaded as e:
+        raise _unavailable(e)
+
+    async def events():
+        accumulator = HitAccumulator()
+        yield _sse("start", {"runs": runs, "seed": seed, "every": every})
+        try:
+            async with compute_pool.admit():
+                blocks = compute_pool.blocks(
+                    runs, seed, resolve_engine("auto"), block_size=every, rules=rules
+                )
+                try:
+                    async for _, _, histogram in blocks:
+                        if await request.is_disconnected():
+                            break
+                        accumulator.add_histogram(histogram)
+                        yield _sse("progress", _progress(accumulator, runs))
+                    else:
+                        yield _sse("done", _progress(accumulator, runs))
+                finally:
+                    await blocks.aclose()
+        except Overloaded as e:
+            yield _sse("error", {"detail": str(e), "retry_after": e.retry_after})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/cache/stats")
+def get_cache_stats():
+    """Result cache hit/miss counters"""
+    return result_cache.stats()
+
+
+@app.get("/api/compute/stats")
+def get_compute_stats():
+    """Compute pool load: running and queued requests, rejections"""
+    return compute_pool.stats()
+
+
+@app.post("/api/jobs", status_code=202)
+async def create_job(request: JobRequest):
+    """
+    Start a simulation in the background and return its job id.
+
+    The job's blocks share the compute pool with simulation requests; with
+    too many jobs queued or running the request gets 503 with Retry-After.
+    """
+    try:
+        job = job_manager.submit(
+            request.runs, seed=request.seed, rules=request.rules.to_rules()
+        )
+    except Overloaded as e:
+        raise _unavailable(e)
+    return job.snapshot()
+
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    """Job status, percent complete and the statistics so far"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    snapshot = job.snapshot()
+    if snapshot["status"] == COMPLETED:
+        snapshot["comparison"] = compare_experimental_vs_theoretical(
+            job.runs, experimental=snapshot["statistics"], rules=job.rules
+        )
+    return snapshot
+
+
+@app.delete("/api/jobs/{job_id}")
+def cancel_job(job_id: str):
+    """Cancel a queued or running job"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.snapshot()
+
+
+def _warm_up():
+    started = time.perf_counter()
+    try:
+        readiness["warmup"] = warm_up(compute_pool.workers)
+    except Exception as e:
+        # Warm-up only saves time; a failure must not keep the API out of service
+        readiness["error"] = str(e)
+    metrics.STAGE_SECONDS.observe(time.perf_counter() - started, stage="warmup")
+    readiness["ready"] = True
+
+
+@app.on_event("startup")
+def start_warmup():
+    if WARMUP:
+        threading.Thread(target=_warm_up, name="warmup", daemon=True).start()
+
+
+@app.on_event("shutdown")
+def shutdown_jobs():
+    job_manager.shutdown()
+    chart_renderer.shutdown()
+    shutdown_pools()
+
+
+@app.get("/api/ready")
+def get_ready():
+    """Readiness probe: 200 once start-up warm-up has finished, 503 before"""
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+
+def _session(game_id: str):
+    session = session_store.get(game_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Game not found or expired")
+    return session
+
+
+def _play(action):
+    """Run a session action, mapping rule violations to HTTP errors"""
+    try:
+        return action()
+    except GameStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@app.post("/api/games", status_code=201)
+def create_game(request: GameRequest):
+    """Start a multiplayer game; players then predict and search each round"""
+    session = session_store.create(
+        request.players, request.rules.to_rules(), request.rounds
+    )
+    return session.snapshot()
+
+
+@app.get("/api/games/{game_id}")
+def get_game(game_id: str):
+    """Phase, board, predictions and finished rounds of a game"""
+    return _session(game_id).snapshot()
+
+
+@app.post("/api/games/{game_id}/predictions")
+def submit_prediction(game_id: str, request: PredictionRequest):
+    """Record one player's prediction; the last one opens the sonar search"""
+    session = _session(game_id)
+    _play(lambda: session.predict(request.player, request.prediction))
+    return session.snapshot()
+
+
+@app.post("/api/games/{game_id}/roll")
+def roll_search(game_id: str):
+    """Perform the next sonar search of the round"""
+    session = _session(game_id)
+    result = _play(session.roll)
+    return {"search": result, "game": session.snapshot()}
+
+
+@app.post("/api/games/{game_id}/search")
+def run_search(game_id: str):
+    """Perform every remaining sonar search of the round and score it"""
+    session = _session(game_id)
+    results = _play(session.search)
+    return {"searches": results, "game": session.snapshot()}
+
+
+@app.get("/api/games/{game_id}/scores")
+def get_scores(game_id: str):
+    """Total and per-round scores of every player"""
+    snapshot = _session(game_id).snapshot()
+    return {
+        "phase": snapshot["phase"],
+        "players": snapshot["players"],
+        "rounds": snapshot["history"],
+    }
+
+
+@app.delete("/api/games/{game_id}", status_code=204)
+def delete_game(game_id: str):
+    if not session_store.delete(game_id):
+        raise HTTPException(status_code=404, detail="Game not found or expired")
+
+
+async def _handle_socket_message(session, player: Optional[int], message):
+    """Apply one client message to the session and broadcast what happened"""
+    if not isinstance(message, dict):
+        raise TypeError("messages must be JSON objects")
+    kind = message.get("type")
+    if kind == "state":
+        return {"type": "state", "game": session.snapshot()}
+    if player is None:
+        raise GameStateError("spectators cannot play")
+
+    if kind == "predict":
+        session.predict(player, int(message["prediction"]))
+        event = {"type": "prediction", "player": player, "phase": session.phase}
+        if session.phase == ROLLING:
+            # Everyone has predicted: reveal the predictions, as at the table
+            event["predictions"] = session.snapshot()["predictions"]
+        await room_hub.broadcast(session.id, event)
+    elif kind in ("roll", "search"):
+        searches = [session.roll()] if kind == "roll" else session.search()
+        await room_hub.broadcast(
+            session.id, {"type": "roll", "player": player, "searches": searches}
+        )
+        if searches[-1]["search"] == session.rules.rolls:
+            await room_hub.broadcast(
+                session.id, {"type": "scored", "game": session.snapshot()}
+            )
+    else:
+        raise ValueError(f"unknown message type {kind!r}")
+    return None
+
+
+@app.websocket("/ws/games/{game_id}")
+async def game_socket(websocket: WebSocket, game_id: str, player: Optional[int] = None):
+    """
+    Live game room: join with ?player=<index> to play or without to watch.
+
+    Clients send {"type": "predict", "prediction": n}, {"type": "roll"},
+    {"type": "search"} or {"type": "state"}. Every member receives
+    "prediction", "roll" and "scored" events; errors and "state" replies go
+    to the sender only.
+    """
+    session = session_store.get(game_id)
+    if session is None:
+        await websocket.close(code=4404, reason="Game not found or expired")
+        return
+    if player is not None and not 0 <= player < len(session.players):
+        await websocket.close(code=4422, reason="Unknown player")
+        return
+
+    await websocket.accept()
+    room_hub.join(game_id, websocket)
+    try:
+        await websocket.send_json({"type": "state", "game": session.snapshot()})
+        # The room hub closes members it failed to reach; stop serving then
+        while websocket.application_state == WebSocketState.CONNECTED:
+            text = await websocket.receive_text()
+            # Keeps the session from expiring while the room is active
+            session_store.get(game_id)
+            try:
+                reply = await _handle_socket_message(session, player, json.loads(text))
+            except GameStateError as e:
+                reply = {"type": "error", "status": 409, "detail": str(e)}
+            except (ValueError, KeyError, TypeError) as e:
+                reply = {"type": "error", "status": 422, "detail": str(e)}
+            if (
+                reply is not None
+                and websocket.application_state == WebSocketState.CONNECTED
+            ):
+                await websocket.send_json(reply)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        room_hub.leave(game_id, websocket)
+
+
+@app.get(
+    "/api/charts/{kind}",
+    response_class=Response,
+    responses={200: {"content": {t: {} for t in MEDIA_TYPES.values()}}},
+)
+def get_chart(
+    http_request: Request,
+    kind: str,
+    result_id: Optional[str] = Query(None, description="Job id to chart"),
+    histogram: Optional[str] = Query(
+        None, description="Instead of result_id: comma-separated games per hit count"
+    ),
+    format: str = Query("png", description=f"One of {FORMATS}"),
+    dpi: int = Query(100, ge=20, le=300, description="PNG resolution"),
+    rows: int = Query(2, ge=1, le=1000, description="Board rows"),
+    cols: int = Query(3, ge=1, le=1000, description="Board columns"),
+    rolls: int = Query(5, ge=1, le=10000, description="Sonar rolls per game"),
+    reroll: bool = Query(False, description="Re-roll squares already hit"),
+):
+    """
+    Render a chart of a job's results or of a posted histogram.
+
+    kind is "hit_distribution" or "comparison" (against theory). A job's own
+    rules are used; the board parameters describe a raw histogram. Charts
+    are drawn on a dedicated worker process and cached by content.
+    """
+    if kind not in KINDS:
+        raise HTTPException(status_code=404, detail=f"Unknown chart kind {kind!r}")
+    if (result_id is None) == (histogram is None):
+        raise HTTPException(
+            status_code=422, detail="give exactly one of result_id and histogram"
+        )
+
+    try:
+        if result_id is not None:
+            job = job_manager.get(result_id)
+            if job is None:
+                raise HTTPException(status_code=404, detail="Job not found or expired")
+            with job.lock:
+                counts = list(job.accumulator.histogram)
+            if not job.accumulator.count:
+                raise HTTPException(status_code=409, detail="Job has no results yet")
+            rules = job.rules
+        else:
+            counts = [int(c) for c in histogram.split(",")]
+            rules = GameRules(rows, cols, rolls, reroll)
+        image = chart_renderer.render(kind, counts, rules, format, dpi)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except TIMEOUT_ERRORS:
+        raise HTTPException(status_code=504, detail="Chart rendering timed out")
+    # A job's chart changes while it runs; a given histogram's never does
+    return _cacheable_response(
+        http_request,
+        image,
+        MEDIA_TYPES[format],
+        max_age=0 if result_id is not None else IMMUTABLE_MAX_AGE,
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text-format metrics"""
+    return metrics.REGISTRY.render()
+
+
+@app.post("/api/strategy")
+async def get_strategy(request: StrategyRequest):
+    """
+    Expected score, variance and score distribution for every prediction
+    (or the best `top`), computed on the compute pool
+    """
+    compute = partial(
+        score_table, request.rules.to_rules(), request.probabilities, request.top
+    )
+    try:
+        return await _admitted(partial(compute_pool.call, compute))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Overloaded as e:
+        raise _unavailable(e)
+    except TIMEOUT_ERRORS:
+        raise HTTPException(
+            status_code=504, detail=f"strategy took over {REQUEST_TIMEOUT:g}s"
+        )
+
 
-@app.get("/api/theoretical")
-def get_theoretical():
-    """Get theoretical probabilities"""
-    return calculate_theoretical_probabilities()
+@app.get("/api/theoretical", response_model=Dict[int, float])
+def get_theoretical(
+    request: Request,
+    squares: int = Query(6, ge=1, le=10000, description="Board squares"),
+    rolls: int = Query(5, ge=0, le=10000, description="Sonar rolls"),
+    reroll: bool = Query(False, description="Re-roll squares already hit"),
+):
+    """Get theoretical probabilities (cacheable; honours If-None-Match)"""
+    if reroll and rolls > squares:
+        raise HTTPException(
+            status_code=422, detail="with re-rolls, rolls cannot exceed squares"
+        )
+    body = encode_json(calculate_theoretical_probabilities(squares, rolls, reroll))
+    return _cacheable_response(request, body)
 
 
 if __name__ == "__main__":
@@ -62,12 +62,13 @@ function runSimulations(n: number) {
   }
 }
 
+// Exact occupancy probabilities: C(6,k) * k! * S(5,k) / 6^5
 const theoretical = {
-  1: 0.0032,
-  2: 0.0617,
-  3: 0.3086,
-  4: 0.4630,
-  5: 0.1646
+  1: 6 / 7776,
+  2: 450 / 7776,
+  3: 3000 / 7776,
+  4: 3600 / 7776,
+  5: 720 / 7776
 }
 
 export const handler: Handler = async (event) => {
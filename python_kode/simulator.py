@@ -4,14 +4,16 @@ Analyserer sannsynlighetsfordelingen av treff basert på kombinatorikk
 """
 
 import random
+import time
 from collections import Counter
+from fractions import Fraction
+from math import comb, factorial
 from typing import Dict
 import matplotlib
 
 matplotlib.use("TkAgg")  # Sørg for at vi bruker en GUI-backend
 import matplotlib.pyplot as plt
 
-
 # ============================================================================
 # KJERNELOGIKK (samme som ubatspill.py)
 # ============================================================================
@@ -22,9 +24,14 @@ def lag_brett():
     return [[False, False, False], [False, False, False]]
 
 
-def kast_terning():
-    """Kaster 6-sidet terning med uniform fordeling"""
-    return random.randint(1, 6)
+def kast_terning(rng=None):
+    """
+    Kaster 6-sidet terning med uniform fordeling.
+
+    rng kan være en egen generator (f.eks. random.Random(frø)) for
+    reproduserbare kjøringer; ellers brukes random-modulen.
+    """
+    return (rng or random).randint(1, 6)
 
 
 def rute_til_koordinater(rute):
@@ -39,17 +46,18 @@ def tell_treff(brett):
     return sum(sum(rad) for rad in brett)
 
 
-def kjør_én_simulering() -> int:
+def kjør_én_simulering(rng=None) -> int:
     """
     Kjører én simulering av sonar-søk.
 
     Returnerer antall unike treff etter 5 terningkast.
     VIKTIG: Ingen re-rolling! Bare 5 rette kast.
+    rng sendes videre til kast_terning.
     """
     brett = lag_brett()
 
     for _ in range(5):
-        kast = kast_terning()
+        kast = kast_terning(rng)
         rad, kol = rute_til_koordinater(kast)
         brett[rad][kol] = True  # Setter til True selv om allerede truffet
 
@@ -61,30 +69,47 @@ def kjør_én_simulering() -> int:
 # ============================================================================
 
 
-def beregn_teoretiske_sannsynligheter() -> Dict[int, float]:
+def stirling_andre_type(n: int, k: int) -> int:
+    """
+    Stirling-tall av andre type S(n,k), regnet ut med rekursjonen
+    S(n,k) = k * S(n-1,k) + S(n-1,k-1).
+    """
+    rad = [1] + [0] * k  # S(0, j) for j = 0..k
+    for _ in range(n):
+        rad = [0] + [j * rad[j] + rad[j - 1] for j in range(1, k + 1)]
+    return rad[k]
+
+
+def beregn_teoretiske_sannsynligheter(
+    antall_ruter: int = 6, antall_kast: int = 5
+) -> Dict[int, float]:
     """
     Beregner teoretiske sannsynligheter ved hjelp av Stirling-tall.
 
     Matematisk bakgrunn:
     - 5 terningkast med 6 mulige utfall hver
-    - Teller UNIKE verdier (med re-roll hvis duplikat)
+    - Teller UNIKE verdier (ingen re-roll, duplikater teller ikke)
     - Dette tilsvarer "balls into bins" problemet
 
     Stirling-tall av andre type S(n,k):
     - S(n,k) = antall måter å partisjonere n elementer i k ikke-tomme mengder
 
-    For vårt problem:
-    P(X=k) basert på kombinatorikk og empiriske beregninger
+    For vårt problem (eksakt, med heltallsbrøker):
+    P(X=k) = C(6,k) * k! * S(5,k) / 6^5
 
     Fordelingen er IKKE binomisk fordi vi ikke teller repetisjoner!
     """
+    totalt = antall_ruter**antall_kast
     return {
-        1: 0.0032,  # Svært sjelden: alle 5 kast treffer samme rute
-        2: 0.0617,  # Sjelden: kun 2 unike ruter
-        3: 0.3086,  # Vanlig: 3 unike ruter
-        4: 0.4630,  # Mest vanlig: 4 unike ruter (modus!)
-        5: 0.1646,  # Uvanlig: alle 5 kast treffer forskjellige ruter
-        6: 0.0,  # Umulig: kan ikke treffe alle 6 med bare 5 kast
+        k: float(
+            Fraction(
+                comb(antall_ruter, k)
+                * factorial(k)
+                * stirling_andre_type(antall_kast, k),
+                totalt,
+            )
+        )
+        for k in range(1, antall_ruter + 1)
     }
 
 
@@ -93,7 +118,12 @@ def beregn_teoretiske_sannsynligheter() -> Dict[int, float]:
 # ============================================================================
 
 
-def kjør_simuleringer(n: int = 10000) -> Dict:
+# Spill per blokk, og sekunder mellom fremdriftsutskrifter
+BLOKKSTØRRELSE = 10000
+FREMDRIFT_INTERVALL = 0.2
+
+
+def kjør_simuleringer(n: int = 10000, rng=None) -> Dict:
     """
     Kjører n Monte Carlo simuleringer.
 
@@ -104,6 +134,8 @@ def kjør_simuleringer(n: int = 10000) -> Dict:
 
     Args:
         n: Antall simuleringer (default 10000)
+        rng: Egen generator, f.eks. random.Random(frø), for en
+            reproduserbar kjøring (default: random-modulen)
 
     Returns:
         Dictionary med statistikk og sannsynligheter
@@ -112,12 +144,19 @@ def kjør_simuleringer(n: int = 10000) -> Dict:
 
     print(f"Kjører {n:,} simuleringer...", end="", flush=True)
 
-    for i in range(n):
-        if (i + 1) % 1000 == 0:
-            print(f"\rKjører {n:,} simuleringer... {i+1:,}/{n:,}", end="", flush=True)
-
-        treff = kjør_én_simulering()
-        resultater.append(treff)
+    # Simuler i blokker og skriv fremdrift maks hvert FREMDRIFT_INTERVALL
+    # sekund, så den indre løkken ikke gjør noe annet enn å simulere
+    neste_utskrift = time.monotonic() + FREMDRIFT_INTERVALL
+    for start in range(0, n, BLOKKSTØRRELSE):
+        blokk = min(BLOKKSTØRRELSE, n - start)
+        resultater.extend(kjør_én_simulering(rng) for _ in range(blokk))
+
+        if time.monotonic() >= neste_utskrift:
+            ferdig = start + blokk
+            print(
+                f"\rKjører {n:,} simuleringer... {ferdig:,}/{n:,}", end="", flush=True
+            )
+            neste_utskrift = time.monotonic() + FREMDRIFT_INTERVALL
 
     print(f"\rKjører {n:,} simuleringer... Ferdig!     ")
 
@@ -151,6 +190,26 @@ def kjør_simuleringer(n: int = 10000) -> Dict:
     }
 
 
+# Poeng for bom med 0, 1 og 2 treff (samme tapsfunksjon som beregn_poeng)
+POENG = (4, 2, 1)
+
+
+def forventet_poeng(sannsynligheter: Dict[int, float]) -> Dict[int, float]:
+    """
+    Forventet poengsum for hver gjetning 1-6 gitt en treff-fordeling.
+
+    E[poeng | gjetning g] = sum over k av POENG[|g - k|] * P(k treff)
+    """
+    return {
+        gjetning: sum(
+            POENG[abs(gjetning - k)] * p
+            for k, p in sannsynligheter.items()
+            if abs(gjetning - k) < len(POENG)
+        )
+        for gjetning in range(1, 7)
+    }
+
+
 def vis_resultater(stats: Dict, teoretisk: Dict[int, float]):
     """Viser resultatene av simuleringen"""
     print(f"\n{'='*70}")
@@ -176,13 +235,30 @@ def vis_resultater(stats: Dict, teoretisk: Dict[int, float]):
 
     print(f"{'='*70}\n")
 
+    # Forventet poeng per gjetning
+    eks_poeng = forventet_poeng(stats["sannsynligheter"])
+    teo_poeng = forventet_poeng(teoretisk)
+    print(f"{'FORVENTET POENG PER GJETNING':^70}")
+    print(f"{'='*70}")
+    print(f"{'Gjetning':<10} {'Eksperimentell':<18} {'Teoretisk':<18}")
+    print(f"{'-'*70}")
+    for gjetning in range(1, 7):
+        print(
+            f"{gjetning:<10} {eks_poeng[gjetning]:<18.4f} {teo_poeng[gjetning]:<18.4f}"
+        )
+    print(f"{'='*70}\n")
+
     # Analyse
+    beste = max(teo_poeng, key=teo_poeng.get)
     print("ANALYSE:")
     print(
         f"- Modus er {stats['modus']} treff (teoretisk: 4 treff med 46,3% sannsynlighet)"
     )
     print(f"- Gjennomsnitt {stats['gjennomsnitt']:.2f} ≈ 3,59 (teoretisk forventning)")
-    print(f"- Optimal strategi: Gjett modus (4), ikke gjennomsnitt!")
+    print(
+        f"- Optimal strategi: Gjett {beste} "
+        f"({teo_poeng[beste]:.3f} poeng i snitt), ikke gjennomsnittet!"
+    )
     print(f"- Grunnen: Poengsystemet belønner nærhet, ikke forventningsverdi")
     print()
 
@@ -334,9 +410,9 @@ def main():
     )
     print()
     print("Stirling-tall S(5,k) brukes for teoretiske sannsynligheter:")
-    print("  - S(5,1) = 1   → P(X=1) ≈ 0,32%  (alle samme)")
+    print("  - S(5,1) = 1   → P(X=1) ≈ 0,08%  (alle samme)")
     print("  - S(5,4) = 10  → P(X=4) ≈ 46,3% (mest vanlig!)")
-    print("  - S(5,5) = 1   → P(X=5) ≈ 16,5% (alle forskjellige)")
+    print("  - S(5,5) = 1   → P(X=5) ≈ 9,26% (alle forskjellige)")
     print("=" * 70)
     print()
 
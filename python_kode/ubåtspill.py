@@ -6,7 +6,6 @@ Implementerer matematisk modell basert på indikatorvariabler og uniform sannsyn
 import random
 from typing import List
 
-
 # ============================================================================
 # KJERNELOGIKK - Matematiske funksjoner
 # ============================================================================
@@ -26,14 +25,17 @@ def lag_brett() -> List[List[bool]]:
     return [[False, False, False], [False, False, False]]
 
 
-def kast_terning() -> int:
+def kast_terning(rng=None) -> int:
     """
     Kaster en 6-sidet terning.
 
     Matematisk: random.randint(1,6) gir uniform fordeling P(X=k) = 1/6
     Dette tilfredsstiller produktsetningen for uavhengige hendelser.
+
+    rng kan være en egen generator (f.eks. random.Random(frø)) for
+    reproduserbare kjøringer; ellers brukes random-modulen.
     """
-    return random.randint(1, 6)
+    return (rng or random).randint(1, 6)
 
 
 def rute_til_koordinater(rute: int) -> tuple:
@@ -59,7 +61,7 @@ def tell_treff(brett: List[List[bool]]) -> int:
     return sum(sum(rad) for rad in brett)
 
 
-def sonar_søk(brett: List[List[bool]], antall_kast: int = 5) -> tuple:
+def sonar_søk(brett: List[List[bool]], antall_kast: int = 5, rng=None) -> tuple:
     """
     Utfører sonar-søk med 5 terningkast.
 
@@ -69,13 +71,15 @@ def sonar_søk(brett: List[List[bool]], antall_kast: int = 5) -> tuple:
     - Teller UNIKE treff, ikke binomisk fordeling
     - E[X] ≈ 3.59 treff, men modus er 4 treff (46.3% sannsynlighet)
 
+    rng sendes videre til kast_terning.
+
     Returverdier: (antall_treff, sekvens_av_kast)
     """
     sekvens = []
 
     for _ in range(antall_kast):
         while True:
-            kast = kast_terning()
+            kast = kast_terning(rng)
             rad, kol = rute_til_koordinater(kast)
 
             if not brett[rad][kol]:
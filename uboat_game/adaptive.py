@@ -0,0 +1,140 @@
+"""Run simulations until the estimates reach a precision target"""
+
+import secrets
+from statistics import NormalDist
+
+from .core import resolve_engine
+from .parallel import iter_blocks
+from .progress import ProgressCallback, throttle
+from .rules import GameRules
+from .stats import HitAccumulator
+
+# Games per block; the stopping rule is only evaluated at growing checkpoints
+ADAPTIVE_BLOCK_SIZE = 8192
+
+# Each precision check happens after this factor more games than the last
+GROWTH_FACTOR = 1.5
+
+
+def confidence_half_widths(accumulator: HitAccumulator, confidence: float) -> dict:
+    """
+    Normal-approximation confidence interval half-widths.
+
+    Returns the half-width for the mean and for every observed bucket
+    probability, keyed by hit count.
+    """
+    n = accumulator.count
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    buckets = {}
+    for k, count in accumulator.hit_distribution().items():
+        p = count / n
+        buckets[k] = z * (p * (1 - p) / n) ** 0.5
+    return {"mean": z * accumulator.std_dev / n**0.5, "buckets": buckets}
+
+
+def precision_met(
+    accumulator: HitAccumulator,
+    half_width: float = None,
+    relative_error: float = None,
+    confidence: float = 0.95,
+) -> bool:
+    """True when the mean and every bucket probability meet the target"""
+    widths = confidence_half_widths(accumulator, confidence)
+    if half_width is not None:
+        if widths["mean"] > half_width or any(
+            w > half_width for w in widths["buckets"].values()
+        ):
+            return False
+    if relative_error is not None:
+        n = accumulator.count
+        if widths["mean"] > relative_error * abs(accumulator.mean):
+            return False
+        for k, w in widths["buckets"].items():
+            if w > relative_error * accumulator.histogram[k] / n:
+                return False
+    return True
+
+
+def run_until_precision(
+    half_width: float = None,
+    relative_error: float = None,
+    confidence: float = 0.95,
+    min_runs: int = 1000,
+    max_runs: int = 10_000_000,
+    seed: int = None,
+    engine: str = "auto",
+    rules: GameRules = None,
+    workers: int = 1,
+    rng_backend: str = None,
+    progress: ProgressCallback = None,
+) -> dict:
+    """
+    Simulate in growing chunks until the confidence intervals are tight enough.
+
+    Args:
+        half_width: Target CI half-width (absolute) for the mean and for every
+            bucket probability
+        relative_error: Target CI half-width relative to each estimate
+        confidence: Confidence level of the intervals
+        min_runs: Games to simulate before the first check
+        max_runs: Stop here even if the target is not met
+        seed: Make the run reproducible
+        engine: "python", "numpy" or "auto"
+        rules: Game rules (default: the standard game)
+        workers: Processes simulating upcoming blocks; results do not
+            depend on it
+        rng_backend: Generator from uboat_game.rng.BACKENDS
+        progress: Called, throttled, with (games done, max_runs) after each
+            block and with (games done, games done) when the run stops
+
+    Returns:
+        Statistics dict as from run_simulations, plus a "precision" entry with
+        the achieved half-widths and whether the target was met
+    """
+    if half_width is None and relative_error is None:
+        raise ValueError("give half_width and/or relative_error")
+    if seed is None:
+        seed = secrets.randbits(64)
+
+    accumulator = HitAccumulator()
+    next_check = min_runs
+    converged = False
+    progress = throttle(progress)
+    if progress is not None:
+        progress(0, max_runs)
+    blocks = iter_blocks(
+        max_runs,
+        seed,
+        resolve_engine(engine),
+        rng_backend,
+        block_size=ADAPTIVE_BLOCK_SIZE,
+        rules=rules,
+        workers=workers,
+    )
+    for _, _, histogram in blocks:
+        accumulator.add_histogram(histogram)
+        if progress is not None:
+            progress(accumulator.count, max_runs)
+        if accumulator.count < next_check:
+            continue
+        if precision_met(accumulator, half_width, relative_error, confidence):
+            converged = True
+            break
+        next_check = int(accumulator.count * GROWTH_FACTOR)
+    # Withdraws blocks still queued on the pool
+    blocks.close()
+    if progress is not None and accumulator.count < max_runs:
+        progress(accumulator.count, accumulator.count)
+
+    widths = confidence_half_widths(accumulator, confidence)
+    stats = accumulator.to_statistics()
+    stats["precision"] = {
+        "converged": converged,
+        "confidence": confidence,
+        "target_half_width": half_width,
+        "target_relative_error": relative_error,
+        "mean_half_width": widths["mean"],
+        "bucket_half_widths": widths["buckets"],
+        "seed": seed,
+    }
+    return stats
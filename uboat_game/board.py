@@ -0,0 +1,116 @@
+"""Compact bitmask board for the simulation hot path"""
+
+from typing import List
+
+try:
+    popcount = int.bit_count  # Python 3.10+
+except AttributeError:  # pragma: no cover - older interpreters
+
+    def popcount(mask: int) -> int:
+        return bin(mask).count("1")
+
+
+class BitBoard:
+    """
+    Board whose hit state is a single integer: bit (square - 1) is set once
+    that square has been hit.
+
+    Marking a hit is one shift and OR, counting hits is one popcount, and no
+    lists are allocated per game. Python ints grow as needed, but every OR
+    then copies the whole integer, so very large boards use SparseBoard.
+    Use to_lists() to get the 2D-list view for printing.
+    """
+
+    __slots__ = ("rows", "cols", "mask")
+
+    def __init__(self, rows: int = 2, cols: int = 3, mask: int = 0):
+        self.rows = rows
+        self.cols = cols
+        self.mask = mask
+
+    @property
+    def squares(self) -> int:
+        return self.rows * self.cols
+
+    def hit(self, square: int) -> bool:
+        """Mark square (1-based) as hit; return True if it was not hit before"""
+        bit = 1 << (square - 1)
+        new_hit = not self.mask & bit
+        self.mask |= bit
+        return new_hit
+
+    def is_hit(self, square: int) -> bool:
+        return bool(self.mask >> (square - 1) & 1)
+
+    def count(self) -> int:
+        """Number of squares hit"""
+        return popcount(self.mask)
+
+    def reset(self):
+        self.mask = 0
+
+    def to_lists(self) -> List[List[bool]]:
+        """2D-list view (rows x cols) as used by create_board and display_board"""
+        return [
+            [self.is_hit(row * self.cols + col + 1) for col in range(self.cols)]
+            for row in range(self.rows)
+        ]
+
+    @classmethod
+    def from_lists(cls, board: List[List[bool]]) -> "BitBoard":
+        cols = len(board[0]) if board else 0
+        mask = 0
+        for row_idx, row in enumerate(board):
+            for col_idx, hit in enumerate(row):
+                if hit:
+                    mask |= 1 << (row_idx * cols + col_idx)
+        return cls(len(board), cols, mask)
+
+    def __repr__(self) -> str:
+        return f"BitBoard(rows={self.rows}, cols={self.cols}, mask={self.mask:#x})"
+
+
+class SparseBoard:
+    """
+    Board that stores only the squares that have been hit.
+
+    Every operation is O(1) regardless of board size, so a game costs time
+    and memory proportional to its rolls. Used for boards too large for a
+    BitBoard to stay a machine-word-sized integer; same interface.
+    """
+
+    __slots__ = ("rows", "cols", "hits")
+
+    def __init__(self, rows: int, cols: int, hits=()):
+        self.rows = rows
+        self.cols = cols
+        self.hits = set(hits)
+
+    @property
+    def squares(self) -> int:
+        return self.rows * self.cols
+
+    def hit(self, square: int) -> bool:
+        """Mark square (1-based) as hit; return True if it was not hit before"""
+        if square in self.hits:
+            return False
+        self.hits.add(square)
+        return True
+
+    def is_hit(self, square: int) -> bool:
+        return square in self.hits
+
+    def count(self) -> int:
+        return len(self.hits)
+
+    def reset(self):
+        self.hits.clear()
+
+    def to_lists(self) -> List[List[bool]]:
+        return [
+            [row * self.cols + col + 1 in self.hits for col in range(self.cols)]
+            for row in range(self.rows)
+        ]
+
+    def __repr__(self) -> str:
+        return f"SparseBoard(rows={self.rows}, cols={self.cols}, hits={len(self.hits)})"
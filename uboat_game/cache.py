@@ -0,0 +1,155 @@
+"""Bounded LRU/TTL result cache with single-flight computation"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable
+
+
+class _Flight:
+    """A computation in progress that later callers wait on"""
+
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResultCache:
+    """
+    Thread-safe cache for expensive, deterministic results.
+
+    Entries expire after `ttl` seconds and the least recently used entry is
+    evicted beyond `maxsize`. When several threads ask for the same missing
+    key at once, only the first one computes it; the others wait for that
+    result instead of starting their own (single-flight). The same holds
+    for coroutines via get_or_compute_async on the event loop.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight = {}
+        self._async_inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], object]):
+        """Return the cached value for key, computing it at most once"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            self._store(key, flight.value)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.event.set()
+        return flight.value
+
+    async def get_or_compute_async(
+        self, key: Hashable, compute: Callable[[], Awaitable[object]]
+    ):
+        """
+        get_or_compute for a coroutine, awaited on the event loop.
+
+        The computation runs as its own task that every caller awaits. A
+        caller that is cancelled (e.g. its client disconnected) stops
+        waiting; the computation itself is only cancelled once no caller
+        is left waiting for it.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            flight = self._async_inflight.get(key)
+            if flight is None:
+                task = asyncio.ensure_future(compute())
+                flight = self._async_inflight[key] = [task, 0]
+                task.add_done_callback(lambda t: self._finish_async(key, flight))
+                self.misses += 1
+            else:
+                self.coalesced += 1
+            flight[1] += 1
+
+        task = flight[0]
+        try:
+            return await asyncio.shield(task)
+        finally:
+            with self._lock:
+                flight[1] -= 1
+                abandoned = not flight[1] and not task.done()
+                if abandoned:
+                    # Forget the flight now: a caller arriving before the
+                    # cancellation completes must start afresh, not inherit it
+                    self._forget_async(key, flight)
+            if abandoned:
+                task.cancel()
+
+    def _forget_async(self, key: Hashable, flight: list):
+        if self._async_inflight.get(key) is flight:
+            del self._async_inflight[key]
+
+    def _finish_async(self, key: Hashable, flight: list):
+        task = flight[0]
+        with self._lock:
+            self._forget_async(key, flight)
+        if not task.cancelled() and task.exception() is None:
+            self._store(key, task.result())
+
+    def _store(self, key: Hashable, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight) + len(self._async_inflight),
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
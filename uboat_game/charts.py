@@ -0,0 +1,147 @@
+"""Chart rendering in an isolated worker process, with an LRU byte cache"""
+
+import hashlib
+import io
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Sequence
+
+from .cache import ResultCache
+from .parallel import pool_context
+from .rules import STANDARD_RULES, GameRules
+from .stats import HitAccumulator
+
+KINDS = ("hit_distribution", "comparison")
+FORMATS = ("png", "svg")
+MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+# Longest a single render may take before the caller gives up on it
+RENDER_TIMEOUT = 30.0
+
+
+def _trimmed(histogram: Sequence[int]) -> List[int]:
+    """Histogram without trailing zeros, so equal data hashes equally"""
+    histogram = [int(c) for c in histogram]
+    while histogram and not histogram[-1]:
+        histogram.pop()
+    return histogram
+
+
+def render_chart(
+    kind: str, histogram: List[int], rules: dict, fmt: str = "png", dpi: int = 100
+) -> bytes:
+    """
+    Draw one chart of a hit histogram and return the encoded image.
+
+    Uses pyplot, whose global figure state is not thread-safe, so the
+    server only calls this in ChartRenderer's single worker process.
+
+    Args:
+        kind: "hit_distribution" or "comparison" (against theory)
+        histogram: Games per hit count, index = hits
+        rules: GameRules.to_dict() of the simulated game
+        fmt: "png" or "svg"
+        dpi: Resolution of PNG output
+    """
+    from .simulator import compare_experimental_vs_theoretical
+    from .visualizer import plot_comparison, plot_hit_distribution
+
+    accumulator = HitAccumulator()
+    accumulator.add_histogram(histogram)
+    stats = accumulator.to_statistics()
+
+    out = io.BytesIO()
+    if kind == "hit_distribution":
+        plot_hit_distribution(stats, out, fmt=fmt, dpi=dpi)
+    else:
+        comparison = compare_experimental_vs_theoretical(
+            stats["n_simulations"],
+            experimental=stats,
+            rules=GameRules.from_dict(rules),
+        )
+        plot_comparison(comparison, out, fmt=fmt, dpi=dpi)
+    return out.getvalue()
+
+
+class ChartRenderer:
+    """
+    Renders charts on one dedicated worker process and caches the bytes.
+
+    The worker is started on first use and handles one chart at a time, so
+    pyplot never runs in a server thread. Finished images are kept in a
+    ResultCache keyed by a hash of the trimmed histogram, the rules and the
+    chart options; repeated and concurrent requests for the same chart are
+    served from memory without rendering again.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: float = 3600.0,
+        timeout: float = RENDER_TIMEOUT,
+    ):
+        self.timeout = timeout
+        self.cache = ResultCache(maxsize=maxsize, ttl=ttl)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _worker(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=1, mp_context=pool_context()
+                )
+            return self._pool
+
+    @staticmethod
+    def key(
+        kind: str, histogram: Sequence[int], rules: GameRules, fmt: str, dpi: int
+    ) -> str:
+        """Cache key: hash of the chart's data and options"""
+        payload = json.dumps(
+            [kind, _trimmed(histogram), rules.to_dict(), fmt, dpi], sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def render(
+        self,
+        kind: str,
+        histogram: Sequence[int],
+        rules: GameRules = None,
+        fmt: str = "png",
+        dpi: int = 100,
+    ) -> bytes:
+        """
+        Encoded chart of a hit histogram, from the cache if possible.
+
+        Raises:
+            ValueError: Unknown kind or format, or an empty histogram
+            TimeoutError: The worker took longer than `timeout`
+        """
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {KINDS}, got {kind!r}")
+        if fmt not in FORMATS:
+            raise ValueError(f"format must be one of {FORMATS}, got {fmt!r}")
+        histogram = _trimmed(histogram)
+        if not histogram or min(histogram) < 0:
+            raise ValueError("histogram needs non-negative counts, at least one > 0")
+        rules = rules or STANDARD_RULES
+        if len(histogram) > rules.max_hits + 1:
+            raise ValueError(f"histogram has hit counts above {rules.max_hits}")
+
+        def compute() -> bytes:
+            future = self._worker().submit(
+                render_chart, kind, histogram, rules.to_dict(), fmt, dpi
+            )
+            return future.result(timeout=self.timeout)
+
+        return self.cache.get_or_compute(
+            self.key(kind, histogram, rules, fmt, dpi), compute
+        )
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
@@ -0,0 +1,161 @@
+"""Periodic checkpoints so long simulation runs can resume after a stop"""
+
+import json
+import os
+import secrets
+import time
+from typing import Optional
+
+from . import metrics
+from .core import resolve_engine
+from .parallel import BLOCK_SIZE, iter_blocks
+from .progress import ProgressCallback, throttle
+from .rng import default_backend
+from .rules import STANDARD_RULES, GameRules
+from .stats import HitAccumulator
+
+CHECKPOINT_VERSION = 1
+
+# Seconds between checkpoint writes. A write is a few hundred bytes, so
+# even much shorter intervals stay far below 1% of the runtime.
+DEFAULT_INTERVAL = 60.0
+
+
+def save_checkpoint(path: str, state: dict):
+    """Write state atomically: a crash mid-write leaves the old file intact"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str) -> Optional[dict]:
+    """Saved state, or None if there is no checkpoint at path"""
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    if state.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"{path}: unsupported checkpoint version")
+    return state
+
+
+def run_checkpointed(
+    n: int,
+    path: str,
+    seed: int = None,
+    engine: str = "auto",
+    workers: int = 1,
+    rng_backend: str = None,
+    rules: GameRules = None,
+    resume: bool = False,
+    interval: float = DEFAULT_INTERVAL,
+    progress: ProgressCallback = None,
+) -> dict:
+    """
+    run_simulations with periodic checkpoints to `path`.
+
+    A checkpoint holds the run's configuration, its seed, the next block to
+    simulate and the accumulated histogram and moments. Blocks are seeded
+    from (seed, block index), so that is the complete RNG state: a resumed
+    run gives statistics identical to an uninterrupted run_simulations with
+    the same n, seed and engine. The checkpoint is removed once the run
+    completes.
+
+    Args:
+        n: Number of games
+        path: Checkpoint file
+        seed: Base seed (default: fresh random seed, saved in the checkpoint)
+        engine: "python", "numpy" or "auto"
+        workers: Processes computing upcoming blocks
+        rng_backend: Generator from uboat_game.rng.BACKENDS
+        rules: Game rules (default: the standard game)
+        resume: Continue from the checkpoint at `path` if there is one
+        interval: Seconds between checkpoint writes
+        progress: Called with (games done, n), throttled, at the start
+            (after any resumed games) and after each block
+
+    Returns:
+        Statistics dict as from run_simulations, plus "seed" and
+        "resumed_from" (games already done when the run resumed)
+    """
+    engine = resolve_engine(engine)
+    rng_backend = rng_backend or default_backend(engine)
+    rules = rules or STANDARD_RULES
+    config = {
+        "n": n,
+        "engine": engine,
+        "rng_backend": rng_backend,
+        "rules": rules.to_dict(),
+        "block_size": BLOCK_SIZE,
+    }
+
+    state = load_checkpoint(path) if resume else None
+    if state is not None:
+        if state["config"] != config or seed not in (None, state["seed"]):
+            raise ValueError(
+                f"{path} was written by a different run "
+                f"(config {state['config']}, seed {state['seed']})"
+            )
+        seed = state["seed"]
+        start = state["next_block"]
+        accumulator = HitAccumulator.from_dict(state["accumulator"])
+    else:
+        if seed is None:
+            seed = secrets.randbits(64)
+        start = 0
+        accumulator = HitAccumulator()
+    resumed_from = accumulator.count
+
+    def checkpoint(next_block: int):
+        save_checkpoint(
+            path,
+            {
+                "version": CHECKPOINT_VERSION,
+                "config": config,
+                "seed": seed,
+                "next_block": next_block,
+                "accumulator": accumulator.to_dict(),
+                "saved_at": time.time(),
+            },
+        )
+
+    progress = throttle(progress)
+    if progress is not None:
+        progress(resumed_from, n)
+
+    started = time.perf_counter()
+    last_save = time.monotonic()
+    next_block = start
+    try:
+        for index, _, histogram in iter_blocks(
+            n, seed, engine, rng_backend, start=start, rules=rules, workers=workers
+        ):
+            accumulator.add_histogram(histogram)
+            next_block = index + 1
+            if progress is not None:
+                progress(accumulator.count, n)
+            if time.monotonic() - last_save >= interval:
+                checkpoint(next_block)
+                last_save = time.monotonic()
+    except BaseException:
+        # Interrupted (Ctrl-C, SystemExit from a SIGTERM handler, an error):
+        # keep everything finished so far
+        checkpoint(next_block)
+        raise
+
+    if metrics.ENABLED:
+        elapsed = time.perf_counter() - started
+        metrics.STAGE_SECONDS.observe(elapsed, stage="sampling")
+        metrics.record_simulation(n - resumed_from, elapsed, engine)
+
+    if os.path.exists(path):
+        os.remove(path)
+
+    stats = accumulator.to_statistics()
+    stats["seed"] = seed
+    stats["resumed_from"] = resumed_from
+    return stats
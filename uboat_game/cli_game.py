@@ -1,15 +1,23 @@
 """CLI Interactive Game"""
 
-import random
-from typing import List, Dict
-from .core import create_board, roll_dice, calculate_score
+import argparse
+from array import array
+from typing import List
+from .core import roll_dice, calculate_score
+from .rules import GameRules, add_rules_arguments, rules_from_args
+
+# The table game re-rolls squares that are already hit
+CLI_RULES = GameRules(reroll=True)
 
 
 class Player:
+    __slots__ = ("name", "predictions", "scores", "total_score")
+
     def __init__(self, name: str):
         self.name = name
-        self.predictions = []
-        self.scores = []
+        # Compact typed arrays; the headless equivalent is tournament.PlayerTally
+        self.predictions = array("i")
+        self.scores = array("i")
         self.total_score = 0
 
     def add_score(self, points: int):
@@ -19,28 +27,24 @@ class Player:
 
 def display_board(board: List[List[bool]], round_num: int):
     """Display 2D board state"""
+    cols = len(board[0])
+    width = max(5, len(str(len(board) * cols)) + 2)
+    separator = "|".join(["-" * width] * cols)
+
     print(f"\n{'='*40}")
     print(f"ROUND {round_num} - BOARD STATE")
     print(f"{'='*40}")
-    print("\n  1  |  2  |  3  ")
-    print("-----|-----|-----")
-    # Row 0: squares 1, 2, 3
-    for col in range(3):
-        status = " X " if board[0][col] else "   "
-        print(f" {status}", end=" |")
-    print()
-    print("-----|-----|-----")
-    print("\n  4  |  5  |  6  ")
-    print("-----|-----|-----")
-    # Row 1: squares 4, 5, 6
-    for col in range(3):
-        status = " X " if board[1][col] else "   "
-        print(f" {status}", end=" |")
-    print()
+    for row_idx, row in enumerate(board):
+        numbers = (row_idx * cols + col + 1 for col in range(cols))
+        print("\n" + "|".join(f"{square:^{width}}" for square in numbers))
+        print(separator)
+        print("|".join(f"{'X' if hit else '':^{width}}" for hit in row))
     print(f"{'='*40}\n")
 
 
-def play_round(players: List[Player], round_num: int) -> None:
+def play_round(
+    players: List[Player], round_num: int, rules: GameRules = CLI_RULES
+) -> None:
     """Play one round of the game"""
     print(f"\n{'#'*50}")
     print(f"{'ROUND ' + str(round_num):^50}")
@@ -48,15 +52,16 @@ def play_round(players: List[Player], round_num: int) -> None:
 
     # Get predictions
     predictions = {}
+    low, high = rules.predictions[0], rules.predictions[-1]
     for player in players:
         while True:
             try:
-                pred = int(input(f"{player.name}, predict hits (1-6): "))
-                if 1 <= pred <= 6:
+                pred = int(input(f"{player.name}, predict hits ({low}-{high}): "))
+                if pred in rules.predictions:
                     predictions[player.name] = pred
                     player.predictions.append(pred)
                     break
-                print("Must be 1-6!")
+                print(f"Must be {low}-{high}!")
             except ValueError:
                 print("Enter a number!")
 
@@ -69,28 +74,29 @@ def play_round(players: List[Player], round_num: int) -> None:
     # Sonar search
     input("\n[Press ENTER to start sonar search]")
 
-    from .core import square_to_coords, count_hits
-
-    board = create_board()
+    board = rules.new_board()
     hit_sequence = []
 
-    for search_num in range(1, 6):
+    for search_num in range(1, rules.rolls + 1):
         while True:
-            roll = roll_dice()
-            row, col = square_to_coords(roll)
+            roll = roll_dice(sides=rules.squares)
 
-            if not board[row][col]:
-                board[row][col] = True
+            if board.hit(roll):
                 hit_sequence.append(roll)
                 print(f"\n🎲 Search {search_num}: Roll = {roll} → Square {roll} HIT!")
                 break
-            else:
+            elif rules.reroll:
                 print(f"🎲 Roll = {roll} → Already hit, re-rolling...")
+            else:
+                print(
+                    f"\n🎲 Search {search_num}: Roll = {roll} → Already hit, no new hit"
+                )
+                break
 
         input("[Press ENTER for next search]")
 
-    total_hits = count_hits(board)
-    display_board(board, round_num)
+    total_hits = board.count()
+    display_board(board.to_lists(), round_num)
 
     print(f"\n{'='*50}")
     print(f"TOTAL HITS: {total_hits}")
@@ -101,7 +107,7 @@ def play_round(players: List[Player], round_num: int) -> None:
     print("ROUND SCORES:")
     for player in players:
         pred = predictions[player.name]
-        points = calculate_score(pred, total_hits)
+        points = calculate_score(pred, total_hits, rules)
         player.add_score(points)
         diff = abs(pred - total_hits)
         print(
@@ -121,7 +127,7 @@ def display_final_scores(players: List[Player]):
 
     for i, player in enumerate(sorted_players, 1):
         print(f"{i}. {player.name}: {player.total_score} points")
-        print(f"   Round scores: {player.scores}")
+        print(f"   Round scores: {player.scores.tolist()}")
 
     winner = sorted_players[0]
     print(f"\n🏆 WINNER: {winner.name} with {winner.total_score} points! 🏆\n")
@@ -129,6 +135,14 @@ def display_final_scores(players: List[Player]):
 
 def main():
     """Main CLI game loop"""
+    parser = argparse.ArgumentParser(description="U-Boat Submarine Game")
+    add_rules_arguments(parser, CLI_RULES)
+    args = parser.parse_args()
+    try:
+        rules = rules_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+
     print("\n" + "=" * 50)
     print("🌊 U-BOAT SUBMARINE GAME 🌊".center(50))
     print("=" * 50)
@@ -158,7 +172,7 @@ def main():
 
     # Play 5 rounds
     for round_num in range(1, 6):
-        play_round(players, round_num)
+        play_round(players, round_num, rules)
         if round_num < 5:
             input("\n[Press ENTER for next round]")
 
@@ -1,13 +1,20 @@
 """Core game logic for U-Boat Submarine Game"""
 
 import random
+import time
 from typing import List, Tuple
-from collections import Counter
 
+from . import metrics
+from .board import popcount
+from .progress import ProgressCallback, throttle
+from .rng import default_backend, make_rng, thread_rng
+from .rules import BITMASK_MAX_SQUARES, STANDARD_RULES, GameRules
+from .stats import HitAccumulator
 
-def create_board() -> List[List[bool]]:
+
+def create_board(rules: GameRules = None) -> List[List[bool]]:
     """
-    Initialize 6-square board as 2D list (2 rows x 3 columns).
+    Initialize board as 2D list (default 6 squares: 2 rows x 3 columns).
 
     Board layout:
         [0][0]=1  [0][1]=2  [0][2]=3
@@ -16,23 +23,18 @@ def create_board() -> List[List[bool]]:
     Returns:
         2D list where False = undetected submarine
     """
-    return [
-        [False, False, False],  # Row 0: squares 1, 2, 3
-        [False, False, False],  # Row 1: squares 4, 5, 6
-    ]
+    rules = rules or STANDARD_RULES
+    return [[False] * rules.cols for _ in range(rules.rows)]
 
 
-def roll_dice() -> int:
-    """Return random int 1-6"""
-    return random.randint(1, 6)
+def roll_dice(rng=None, sides: int = 6) -> int:
+    """Return random int 1-sides (from `rng` if given, else the random module)"""
+    return (rng or random).randint(1, sides)
 
 
-def square_to_coords(square_num: int) -> Tuple[int, int]:
+def square_to_coords(square_num: int, rules: GameRules = None) -> Tuple[int, int]:
     """Convert square number (1-6) to 2D board coordinates (row, col)"""
-    square_idx = square_num - 1
-    row = square_idx // 3
-    col = square_idx % 3
-    return row, col
+    return (rules or STANDARD_RULES).coords(square_num)
 
 
 def count_hits(board: List[List[bool]]) -> int:
@@ -40,93 +42,219 @@ def count_hits(board: List[List[bool]]) -> int:
     return sum(sum(row) for row in board)
 
 
-def perform_sonar_search(board: List[List[bool]] = None) -> Tuple[int, List[int]]:
+def perform_sonar_search(
+    board=None, rng=None, rules: GameRules = None
+) -> Tuple[int, List[int]]:
     """
     Execute 5 dice rolls (sonar searches).
 
     Each roll checks a square. If already hit, it doesn't count as a new hit.
-    No re-rolls - just 5 straight dice rolls, counting unique hits.
+    No re-rolls - just 5 straight dice rolls, counting unique hits. Other
+    board sizes, roll counts and the re-roll rule come from `rules`.
+
+    Args:
+        board: 2D list (updated in place), BitBoard or SparseBoard;
+            default a new board from rules.new_board()
+        rng: Generator with randint(a, b) (default: the random module)
+        rules: Game rules (default: the standard game)
 
     Returns:
-        (total_hits, roll_sequence): Number of unique hits and all 5 rolls
+        (total_hits, roll_sequence): Number of unique hits and every roll,
+        including re-rolled ones
     """
+    rules = rules or STANDARD_RULES
     if board is None:
-        board = create_board()
+        board = rules.new_board()
 
-    roll_sequence = []
+    if isinstance(board, list):
+        board = _ListBoard(board, rules)
 
-    for _ in range(5):
-        roll = roll_dice()
-        roll_sequence.append(roll)
-        row, col = square_to_coords(roll)
-        board[row][col] = True
+    roll_sequence = []
+    for _ in range(rules.rolls):
+        while True:
+            roll = roll_dice(rng, rules.squares)
+            roll_sequence.append(roll)
+            if board.hit(roll) or not rules.reroll:
+                break
 
-    total_hits = count_hits(board)
-    return total_hits, roll_sequence
+    if isinstance(board, _ListBoard):
+        return count_hits(board.board), roll_sequence
+    return board.count(), roll_sequence
 
 
-def calculate_score(prediction: int, actual_hits: int) -> int:
+def calculate_score(prediction: int, actual_hits: int, rules: GameRules = None) -> int:
     """
     Apply scoring rules.
 
     Args:
         prediction: Player's predicted number of hits
         actual_hits: Actual number of hits from sonar search
+        rules: Game rules with the points table (default: the standard game)
 
     Returns:
         Points: 4 (exact), 2 (±1), 1 (±2), 0 (>±2)
     """
+    points = (rules or STANDARD_RULES).points
     diff = abs(prediction - actual_hits)
-
-    if diff == 0:
-        return 4
-    elif diff == 1:
-        return 2
-    elif diff == 2:
-        return 1
-    else:
-        return 0
+    return points[diff] if diff < len(points) else 0
 
 
-def simulate_single_game() -> int:
+def simulate_single_game(rng=None, rules: GameRules = None) -> int:
     """Run one complete game, return hit count"""
-    hits, _ = perform_sonar_search()
+    hits, _ = perform_sonar_search(rng=rng, rules=rules)
     return hits
 
 
-def run_simulations(n: int) -> dict:
+class _ListBoard:
+    """hit() adapter that marks squares on a 2D-list board in place"""
+
+    __slots__ = ("board", "rules")
+
+    def __init__(self, board: List[List[bool]], rules: GameRules):
+        self.board = board
+        self.rules = rules
+
+    def hit(self, square: int) -> bool:
+        row, col = self.rules.coords(square)
+        new_hit = not self.board[row][col]
+        self.board[row][col] = True
+        return new_hit
+
+
+ENGINES = ("auto", "python", "numpy")
+
+
+def resolve_engine(engine: str = "auto") -> str:
+    """Map an engine name to the engine that will actually run"""
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
+    if engine == "auto":
+        from .vectorized import NUMPY_AVAILABLE
+
+        return "numpy" if NUMPY_AVAILABLE else "python"
+    return engine
+
+
+def simulate_histogram(
+    n: int, keep_raw: bool = False, rng=None, rules: GameRules = None
+):
+    """
+    Play n games one at a time and count hit totals.
+
+    Without an explicit rng the calling thread's private generator is used,
+    so concurrent simulations never contend on the random module's state.
+
+    Returns:
+        (histogram, raw_results): histogram[k] = games with k hits
+        (k = 0..rules.max_hits), raw_results is the list of per-game hits or
+        None unless keep_raw
+    """
+    rules = rules or STANDARD_RULES
+    histogram = [0] * (rules.max_hits + 1)
+
+    certain = rules.certain_hits
+    if certain is not None:
+        histogram[certain] = n
+        return histogram, [certain] * n if keep_raw else None
+
+    if rng is None:
+        rng = thread_rng()
+    randint = rng.randint
+    squares = rules.squares
+    rolls = range(rules.rolls)
+    bitmask = rules.squares <= BITMASK_MAX_SQUARES
+    raw_results = [] if keep_raw else None
+    for _ in range(n):
+        if bitmask:
+            # Inline BitBoard: one bit per square, hits = set bits
+            mask = 0
+            for _ in rolls:
+                mask |= 1 << randint(1, squares)
+            hits = popcount(mask)
+        else:
+            # Inline SparseBoard: cost follows the rolls, not the squares
+            hits = len({randint(1, squares) for _ in rolls})
+        histogram[hits] += 1
+        if keep_raw:
+            raw_results.append(hits)
+    return histogram, raw_results
+
+
+def run_simulations(
+    n: int,
+    engine: str = "auto",
+    keep_raw: bool = False,
+    seed: int = None,
+    workers: int = 1,
+    rng_backend: str = None,
+    rules: GameRules = None,
+    progress: ProgressCallback = None,
+) -> dict:
     """
     Run game N times, return statistics.
 
     Args:
         n: Number of simulations to run
+        engine: "python" (one game at a time), "numpy" (vectorized batches)
+            or "auto" (numpy when installed)
+        keep_raw: Also return every game's hit count as "raw_results"
+        seed: Make the run reproducible; the same (n, seed, engine) gives
+            identical results for any number of workers
+        workers: Processes to spread the games over
+        rng_backend: Generator from uboat_game.rng.BACKENDS (default: the
+            engine's native generator)
+        rules: Game rules (default: the standard game)
+        progress: Called with (games done, n) per block of games, at most
+            every PROGRESS_INTERVAL seconds and once at the end; without it
+            the run takes the same path as before
 
     Returns:
         Dictionary with statistics and probability distribution
     """
-    results = [simulate_single_game() for _ in range(n)]
-    hit_counts = Counter(results)
-
-    # Calculate statistics
-    mean_hits = sum(results) / len(results)
-    sorted_results = sorted(results)
-    median_hits = sorted_results[len(sorted_results) // 2]
-    mode_hits = hit_counts.most_common(1)[0][0]
-
-    # Standard deviation
-    variance = sum((x - mean_hits) ** 2 for x in results) / len(results)
-    std_dev = variance**0.5
-
-    # Probability distribution
-    probabilities = {k: v / n for k, v in hit_counts.items()}
-
-    return {
-        "n_simulations": n,
-        "hit_distribution": dict(hit_counts),
-        "mean_hits": mean_hits,
-        "median_hits": median_hits,
-        "mode_hits": mode_hits,
-        "std_dev": std_dev,
-        "probabilities": probabilities,
-        "raw_results": results,
-    }
+    engine = resolve_engine(engine)
+    rng_backend = rng_backend or default_backend(engine)
+    progress = throttle(progress)
+    start = time.perf_counter()
+
+    if seed is not None or workers > 1:
+        from .parallel import run_sharded
+
+        accumulator = run_sharded(
+            n, seed, workers, engine, keep_raw, rng_backend, rules, progress
+        )
+    else:
+        if engine == "numpy":
+            from .vectorized import simulate_histogram as engine_histogram
+        else:
+            engine_histogram = simulate_histogram
+
+        rng = None
+        if rng_backend != default_backend(engine):
+            rng = make_rng(None, rng_backend)
+        accumulator = HitAccumulator(keep_raw=keep_raw)
+        if progress is None:
+            histogram, raw_results = engine_histogram(
+                n, keep_raw=keep_raw, rng=rng, rules=rules
+            )
+            accumulator.add_histogram(histogram, raw_results)
+        else:
+            from .parallel import BLOCK_SIZE, block_sizes
+
+            if rng is None and engine == "numpy":
+                # One generator across blocks rather than a fresh one each
+                rng = make_rng(None, rng_backend)
+            progress(0, n)
+            for size in block_sizes(n, BLOCK_SIZE):
+                histogram, raw_results = engine_histogram(
+                    size, keep_raw=keep_raw, rng=rng, rules=rules
+                )
+                accumulator.add_histogram(histogram, raw_results)
+                progress(accumulator.count, n)
+
+    if metrics.ENABLED:
+        elapsed = time.perf_counter() - start
+        metrics.STAGE_SECONDS.observe(elapsed, stage="sampling")
+        metrics.record_simulation(n, elapsed, engine)
+
+    with metrics.STAGE_SECONDS.time(stage="statistics"):
+        return accumulator.to_statistics()
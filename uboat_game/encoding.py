@@ -0,0 +1,28 @@
+"""JSON encoding for API responses, using orjson when it is installed"""
+
+import json
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    # Integer dict keys (hit counts) become strings, as with json.dumps
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def encode_json(content) -> bytes:
+    """
+    Compact UTF-8 JSON, as Starlette's JSONResponse renders it.
+
+    orjson encodes the statistics dicts several times faster than the
+    standard library; without it the output is produced by json.dumps.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, option=_ORJSON_OPTIONS)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
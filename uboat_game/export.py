@@ -0,0 +1,193 @@
+"""Streaming binary export of per-game results for offline analysis"""
+
+import json
+import os
+import secrets
+from typing import Optional, Tuple
+
+from .parallel import BLOCK_SIZE, block_sizes, derive_seed
+from .progress import ProgressCallback, throttle
+from .rng import default_backend, make_rng
+from .rules import STANDARD_RULES, GameRules
+from .stats import HitAccumulator
+from .vectorized import NUMPY_AVAILABLE, iter_game_batches
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+FORMATS = ("json", "npy", "raw")
+
+# File name suffix of the data files per binary format
+SUFFIXES = {"npy": ".npy", "raw": ".bin"}
+
+
+def _dtype_for(max_value: int) -> str:
+    """Smallest unsigned dtype name that holds 0..max_value"""
+    if max_value <= 0xFF:
+        return "uint8"
+    if max_value <= 0xFFFF:
+        return "uint16"
+    return "uint32"
+
+
+def output_paths(output: str, fmt: str, rolls: bool = False) -> dict:
+    """
+    Data and sidecar paths for an --output path.
+
+    results.json (or just results) becomes results.npy / results.bin for
+    the hits, results.rolls.npy / results.rolls.bin for the rolls and
+    results.json for the metadata sidecar.
+    """
+    stem = os.path.splitext(output)[0]
+    suffix = SUFFIXES[fmt]
+    return {
+        "hits": stem + suffix,
+        "rolls": stem + ".rolls" + suffix if rolls else None,
+        "sidecar": stem + ".json",
+    }
+
+
+class ArrayWriter:
+    """
+    Appends chunks to a file holding one C-ordered array.
+
+    The final shape must be known up front: for .npy it goes in the
+    header, which is written first, so chunks are streamed straight to
+    disk and the file is complete without being rewritten. Raw files hold
+    the bare bytes only.
+    """
+
+    def __init__(self, path: str, fmt: str, dtype: str, shape: Tuple[int, ...]):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.shape = shape
+        self._file = open(path, "wb")
+        if fmt == "npy":
+            header = {"descr": self.dtype.str, "fortran_order": False, "shape": shape}
+            np.lib.format.write_array_header_2_0(self._file, header)
+
+    def write(self, chunk: "np.ndarray"):
+        self._file.write(np.ascontiguousarray(chunk, dtype=self.dtype).tobytes())
+
+    def close(self):
+        self._file.close()
+
+    def describe(self) -> dict:
+        return {
+            "file": os.path.basename(self.path),
+            "dtype": self.dtype.name,
+            "shape": list(self.shape),
+        }
+
+
+def export_games(
+    output: str,
+    n: int,
+    fmt: str = "npy",
+    seed: int = None,
+    rules: GameRules = None,
+    rolls: bool = False,
+    rng_backend: str = None,
+    progress: ProgressCallback = None,
+) -> dict:
+    """
+    Simulate n games and stream every game's hits (and rolls) to disk.
+
+    Games are drawn in the same seeded blocks as run_simulations with the
+    numpy engine, so the exported data reproduces its statistics for the
+    same seed. Only one block is in memory at a time.
+
+    Args:
+        output: Output path; see output_paths for the files written
+        n: Number of games
+        fmt: "npy" or "raw" (bare bytes, shape and dtype in the sidecar)
+        seed: Base seed (default: fresh random seed)
+        rules: Game rules (default: the standard game)
+        rolls: Also write the (n, rolls) array of rolled squares (1-based)
+        rng_backend: Generator from uboat_game.rng.BACKENDS
+        progress: Called with (games written, n), throttled, at the start
+            and after each block
+
+    Returns:
+        Sidecar metadata: files with dtype and shape, seed, rules and the
+        statistics of the exported games (written to the sidecar path by
+        write_sidecar)
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy not installed")
+    if fmt not in SUFFIXES:
+        raise ValueError(f"format must be one of {tuple(SUFFIXES)}, got {fmt!r}")
+    rules = rules or STANDARD_RULES
+    if seed is None:
+        seed = secrets.randbits(64)
+    rng_backend = rng_backend or default_backend("numpy")
+    paths = output_paths(output, fmt, rolls)
+
+    hits_writer = ArrayWriter(paths["hits"], fmt, _dtype_for(rules.max_hits), (n,))
+    rolls_writer: Optional[ArrayWriter] = None
+    if rolls:
+        rolls_writer = ArrayWriter(
+            paths["rolls"], fmt, _dtype_for(rules.squares), (n, rules.rolls)
+        )
+
+    accumulator = HitAccumulator()
+    progress = throttle(progress)
+    if progress is not None:
+        progress(0, n)
+    try:
+        for index, size in enumerate(block_sizes(n, BLOCK_SIZE)):
+            rng = make_rng(derive_seed(seed, index), rng_backend)
+            for hits, rolled in iter_game_batches(
+                size, rng=rng, rules=rules, with_rolls=rolls
+            ):
+                hits_writer.write(hits)
+                accumulator.add_histogram(
+                    np.bincount(hits, minlength=rules.max_hits + 1).tolist()
+                )
+                if rolls_writer is not None:
+                    # Widen first: square 256 does not fit the uint8 draw
+                    rolls_writer.write(rolled.astype(rolls_writer.dtype) + 1)
+            if progress is not None:
+                progress(accumulator.count, n)
+    finally:
+        hits_writer.close()
+        if rolls_writer is not None:
+            rolls_writer.close()
+
+    return {
+        "format": fmt,
+        "hits": hits_writer.describe(),
+        "rolls": rolls_writer.describe() if rolls_writer else None,
+        "n_games": n,
+        "seed": seed,
+        "engine": "numpy",
+        "rng_backend": rng_backend,
+        "rules": rules.to_dict(),
+        "statistics": accumulator.to_statistics(),
+    }
+
+
+def write_sidecar(path: str, metadata: dict):
+    with open(path, "w") as f:
+        json.dump(metadata, f, indent=2)
+
+
+def open_array(sidecar: str, name: str = "hits") -> "np.ndarray":
+    """
+    Memory-map an exported array read-only, without copying it into RAM.
+
+    Args:
+        sidecar: Path of the JSON sidecar written next to the data
+        name: "hits" or "rolls"
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy not installed")
+    with open(sidecar) as f:
+        metadata = json.load(f)
+    entry = metadata[name]
+    if entry is None:
+        raise ValueError(f"{sidecar} has no {name} array")
+    path = os.path.join(os.path.dirname(sidecar), entry["file"])
+    if metadata["format"] == "npy":
+        return np.load(path, mmap_mode="r")
+    return np.memmap(path, dtype=entry["dtype"], mode="r", shape=tuple(entry["shape"]))
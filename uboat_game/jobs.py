@@ -0,0 +1,285 @@
+"""Background simulation jobs with progress, cancellation and expiry"""
+
+import asyncio
+import logging
+import secrets
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from .core import resolve_engine
+from .offload import ComputePool, Overloaded, WorkerLost
+from .parallel import block_sizes, simulate_block
+from .progress import RateMeter, chain, log_progress, throttle
+from .rules import GameRules
+from .stats import HitAccumulator
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+FINISHED = (COMPLETED, CANCELLED, FAILED)
+
+# Seconds between progress log lines of one job
+LOG_INTERVAL = 5.0
+
+# Retry-After for a new job while the job queue is full and no running job
+# has an estimate yet
+JOB_RETRY_AFTER = 30
+
+
+class Job:
+    """State of one simulation job, updated block by block by a worker"""
+
+    __slots__ = (
+        "id",
+        "runs",
+        "seed",
+        "engine",
+        "rng_backend",
+        "rules",
+        "status",
+        "accumulator",
+        "meter",
+        "games_per_second",
+        "eta_seconds",
+        "error",
+        "created_at",
+        "finished_at",
+        "cancel_event",
+        "lock",
+    )
+
+    def __init__(
+        self,
+        runs: int,
+        seed: int,
+        engine: str,
+        rng_backend: str = None,
+        rules: GameRules = None,
+    ):
+        self.id = uuid.uuid4().hex
+        self.runs = runs
+        self.seed = seed
+        self.engine = engine
+        self.rng_backend = rng_backend
+        self.rules = rules
+        self.status = QUEUED
+        self.accumulator = HitAccumulator()
+        self.meter = RateMeter()
+        self.games_per_second = 0.0
+        self.eta_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.cancel_event = threading.Event()
+        self.lock = threading.Lock()
+
+    def report_progress(self, done: int, total: int):
+        """Progress callback: refresh the job's rate and time remaining"""
+        rate, eta = self.meter.update(done, total)
+        with self.lock:
+            self.games_per_second = rate
+            self.eta_seconds = eta
+
+    def snapshot(self) -> dict:
+        """Status, progress and the statistics accumulated so far"""
+        with self.lock:
+            completed = self.accumulator.count
+            statistics = self.accumulator.to_statistics() if completed else None
+            return {
+                "id": self.id,
+                "status": self.status,
+                "runs": self.runs,
+                "seed": self.seed,
+                "completed": completed,
+                "percent": 100.0 * completed / self.runs,
+                "games_per_second": self.games_per_second,
+                "eta_seconds": self.eta_seconds,
+                "statistics": statistics,
+                "error": self.error,
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+            }
+
+
+class JobManager:
+    """
+    Runs simulation jobs on a ComputePool.
+
+    Jobs are asyncio tasks on the server's event loop, at most `max_running`
+    at a time and at most `max_jobs` queued or running. Each block of a job
+    is admitted to the compute pool like a request, so jobs share the
+    worker processes and queue limits with requests instead of delaying
+    them for the whole run. Each job is simulated in seeded blocks, so its
+    partial statistics can be read at any time and the final result equals
+    run_simulations with the same seed. Finished jobs are kept for
+    `result_ttl` seconds. With a logger, every job also logs its progress
+    every LOG_INTERVAL seconds.
+    """
+
+    def __init__(
+        self,
+        compute_pool: ComputePool,
+        max_running: int = 2,
+        max_jobs: int = 16,
+        result_ttl: float = 3600.0,
+        logger: logging.Logger = None,
+    ):
+        self.compute_pool = compute_pool
+        self.max_running = max_running
+        self.max_jobs = max_jobs
+        self.result_ttl = result_ttl
+        self.logger = logger
+        self._running: Optional[asyncio.Semaphore] = None
+        self._jobs: Dict[str, Job] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        runs: int,
+        seed: int = None,
+        engine: str = "auto",
+        rng_backend: str = None,
+        rules: GameRules = None,
+    ) -> Job:
+        """
+        Queue a job and return it immediately. Call from the event loop.
+
+        Raises:
+            Overloaded: max_jobs jobs are already queued or running
+        """
+        self.purge_expired()
+        if self.active_count() >= self.max_jobs:
+            raise Overloaded(self._retry_after(), "job queue full")
+        if seed is None:
+            seed = secrets.randbits(64)
+        job = Job(runs, seed, resolve_engine(engine), rng_backend, rules)
+        with self._lock:
+            self._jobs[job.id] = job
+        if self._running is None:
+            self._running = asyncio.Semaphore(self.max_running)
+        task = asyncio.ensure_future(self._run(job))
+        self._tasks.append(task)
+        task.add_done_callback(self._tasks.remove)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self.purge_expired()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Ask a queued or running job to stop after its current block"""
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel_event.set()
+            with job.lock:
+                if job.status == QUEUED:
+                    job.status = CANCELLED
+                    job.finished_at = time.time()
+        return job
+
+    def active_count(self) -> int:
+        """Jobs that are queued or running"""
+        with self._lock:
+            return sum(job.status not in FINISHED for job in self._jobs.values())
+
+    def purge_expired(self):
+        """Drop finished jobs older than result_ttl"""
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job.finished_at is not None and job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def shutdown(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel_event.set()
+        for task in list(self._tasks):
+            task.cancel()
+
+    def _retry_after(self) -> int:
+        """Seconds until a running job is expected to finish"""
+        with self._lock:
+            etas = [
+                job.eta_seconds
+                for job in self._jobs.values()
+                if job.status == RUNNING and job.eta_seconds is not None
+            ]
+        return max(1, round(min(etas))) if etas else JOB_RETRY_AFTER
+
+    async def _block(self, job: Job, index: int, size: int) -> List[int]:
+        """Histogram of one block of a job, waiting while the pool is full"""
+        while True:
+            try:
+                # Waiting blocks are not client rejections: keep them out of
+                # the rejected counter
+                async with self.compute_pool.admit(count=False):
+                    histogram, _ = await self.compute_pool.call(
+                        simulate_block,
+                        job.engine,
+                        job.seed,
+                        index,
+                        size,
+                        False,
+                        job.rng_backend,
+                        job.rules,
+                    )
+                    return histogram
+            except WorkerLost:
+                raise
+            except Overloaded as e:
+                await asyncio.sleep(e.retry_after)
+
+    async def _run(self, job: Job):
+        async with self._running:
+            with job.lock:
+                if job.status != QUEUED:
+                    return
+                job.status = RUNNING
+
+            progress = throttle(job.report_progress)
+            if self.logger is not None:
+                progress = chain(
+                    progress,
+                    throttle(log_progress(self.logger, f"job {job.id}"), LOG_INTERVAL),
+                )
+            progress(0, job.runs)
+            try:
+                for index, size in enumerate(block_sizes(job.runs)):
+                    if job.cancel_event.is_set():
+                        break
+                    histogram = await self._block(job, index, size)
+                    with job.lock:
+                        job.accumulator.add_histogram(histogram)
+                        completed = job.accumulator.count
+                    progress(completed, job.runs)
+            except asyncio.CancelledError:
+                # Server shutdown
+                with job.lock:
+                    job.status = CANCELLED
+                    job.finished_at = time.time()
+                raise
+            except Exception as e:
+                with job.lock:
+                    job.status = FAILED
+                    job.error = str(e)
+                    job.finished_at = time.time()
+                return
+
+            with job.lock:
+                job.status = (
+                    COMPLETED if job.accumulator.count == job.runs else CANCELLED
+                )
+                job.finished_at = time.time()
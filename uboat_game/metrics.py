@@ -0,0 +1,190 @@
+"""Minimal Prometheus-style metrics with near-zero cost when disabled"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Tuple
+
+# Instrumentation is on unless UBOAT_METRICS=0; enable() switches at runtime
+ENABLED = os.environ.get("UBOAT_METRICS", "1") != "0"
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NULL_CONTEXT = nullcontext()
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def enable(on: bool = True):
+    global ENABLED
+    ENABLED = on
+
+
+def _label_key(labels: dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        if not ENABLED:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in self._values.items():
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        if not ENABLED:
+            return
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class GaugeFunc(_Metric):
+    """Gauge whose value is read from a callback at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, func: Callable[[], float]):
+        super().__init__(name, help_text)
+        self.func = func
+
+    def render(self) -> List[str]:
+        return super().render() + [f"{self.name} {self.func()}"]
+
+
+class CounterFunc(GaugeFunc):
+    """Counter whose running total is read from a callback at scrape time"""
+
+    kind = "counter"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets)
+        self._series: Dict[LabelKey, list] = {}
+
+    def observe(self, value: float, **labels):
+        if not ENABLED:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (non-cumulative), then sum and count
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def time(self, **labels):
+        """Context manager observing the elapsed seconds of its block"""
+        if not ENABLED:
+            return _NULL_CONTEXT
+        return self._timer(labels)
+
+    @contextmanager
+    def _timer(self, labels: dict):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, series in self._series.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    labels = _format_labels(key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(
+    Histogram("uboat_stage_seconds", "Time spent per simulation stage")
+)
+GAMES_SIMULATED = REGISTRY.register(
+    Counter("uboat_games_simulated_total", "Games simulated")
+)
+GAMES_PER_SECOND = REGISTRY.register(
+    Gauge("uboat_games_per_second", "Sampling throughput of the last simulation")
+)
+
+
+def record_simulation(games: int, seconds: float, engine: str):
+    """Count simulated games and note the sampling throughput"""
+    if not ENABLED:
+        return
+    GAMES_SIMULATED.inc(games, engine=engine)
+    if seconds > 0:
+        GAMES_PER_SECOND.set(games / seconds, engine=engine)
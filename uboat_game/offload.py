@@ -0,0 +1,231 @@
+"""Admission-controlled offload of CPU-bound work to the process pool"""
+
+import asyncio
+import math
+import os
+import secrets
+import time
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Tuple
+
+from . import metrics
+from .core import resolve_engine
+from .parallel import (
+    BLOCK_SIZE,
+    block_sizes,
+    discard_pool,
+    get_pool,
+    simulate_block,
+)
+from .rng import default_backend
+from .rules import GameRules
+from .stats import HitAccumulator
+
+# Weight of the newest request in the running mean duration behind
+# Retry-After estimates
+DURATION_SMOOTHING = 0.2
+
+
+class Overloaded(Exception):
+    """Every worker is busy and the wait queue is full"""
+
+    def __init__(self, retry_after: int, reason: str = "server busy"):
+        super().__init__(f"{reason}, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class WorkerLost(Overloaded):
+    """A worker process died (e.g. killed for memory) while running a request"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(retry_after, "a worker process died")
+
+
+class ComputePool:
+    """
+    Runs simulations on the shared process pool from asyncio code.
+
+    At most `workers` requests compute at once and at most `max_queue` more
+    wait for a turn; beyond that admit() raises Overloaded at once instead
+    of letting latency grow without bound. The event loop only hands out
+    blocks and merges their histograms, so the GIL stays free for light
+    requests. Simulations are driven block by block: cancelling the calling
+    task (client gone, timeout) stops the run after the blocks already on
+    a worker, and blocks not yet started are withdrawn.
+
+    If a worker process dies, the broken pool is replaced by a fresh one and
+    the lost work is submitted once more; a second loss raises WorkerLost,
+    which callers report like Overloaded.
+    """
+
+    def __init__(self, workers: int = None, max_queue: int = 32):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.pending = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.mean_seconds = 1.0
+        self._slots = asyncio.Semaphore(self.workers)
+
+    @property
+    def full(self) -> bool:
+        """Whether admit() would turn a request away now"""
+        return self.pending >= self.workers + self.max_queue
+
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is likely to be free"""
+        waiting = max(self.pending - self.workers + 1, 1)
+        return max(1, math.ceil(self.mean_seconds * waiting / self.workers))
+
+    def check(self, count: bool = True):
+        """
+        Raise Overloaded if a request would be turned away now; `count`
+        False keeps internal retries (job blocks) out of `rejected`
+        """
+        if self.full:
+            if count:
+                self.rejected += 1
+            raise Overloaded(self.retry_after())
+
+    @asynccontextmanager
+    async def admit(self, count: bool = True):
+        """Hold one compute slot, waiting in the queue if needed"""
+        self.check(count)
+        self.pending += 1
+        try:
+            async with self._slots:
+                started = time.monotonic()
+                try:
+                    yield
+                except asyncio.CancelledError:
+                    self.cancelled += 1
+                    raise
+                elapsed = time.monotonic() - started
+                self.mean_seconds += DURATION_SMOOTHING * (elapsed - self.mean_seconds)
+        finally:
+            self.pending -= 1
+
+    def _submit(self, fn, *args):
+        """(pool, future) of fn(*args), replacing the pool first if broken"""
+        pool = get_pool(self.workers)
+        try:
+            return pool, pool.submit(fn, *args)
+        except BrokenProcessPool:
+            discard_pool(pool)
+            pool = get_pool(self.workers)
+            return pool, pool.submit(fn, *args)
+
+    def _discard(self, pool, retries: int) -> int:
+        """Drop a pool whose worker died; retries left, or WorkerLost"""
+        discard_pool(pool)
+        if retries <= 0:
+            raise WorkerLost(self.retry_after())
+        return retries - 1
+
+    async def call(self, fn, *args):
+        """fn(*args) on a worker process; withdrawn if cancelled before it starts"""
+        retries = 1
+        while True:
+            pool, future = self._submit(fn, *args)
+            try:
+                return await asyncio.wrap_future(future)
+            except BrokenProcessPool:
+                retries = self._discard(pool, retries)
+            finally:
+                future.cancel()
+
+    async def blocks(
+        self,
+        n: int,
+        seed: int,
+        engine: str = "numpy",
+        rng_backend: str = None,
+        block_size: int = BLOCK_SIZE,
+        rules: GameRules = None,
+        window: int = 1,
+    ) -> AsyncIterator[Tuple[int, int, List[int]]]:
+        """
+        Async parallel.iter_blocks: the same blocks, computed on the pool.
+
+        Up to `window` blocks of the run are on workers at a time; they are
+        yielded in block order, so results match iter_blocks exactly.
+        """
+
+        def submit(index: int, size: int):
+            pool, future = self._submit(
+                simulate_block, engine, seed, index, size, False, rng_backend, rules
+            )
+            return index, size, pool, future
+
+        sizes = block_sizes(n, block_size)
+        in_flight = deque()
+        next_index = 0
+        retries = 1
+        try:
+            while next_index < len(sizes) or in_flight:
+                while next_index < len(sizes) and len(in_flight) < window:
+                    in_flight.append(submit(next_index, sizes[next_index]))
+                    next_index += 1
+                index, size, pool, future = in_flight[0]
+                try:
+                    histogram = (await asyncio.wrap_future(future))[0]
+                except BrokenProcessPool:
+                    retries = self._discard(pool, retries)
+                    # Blocks are seeded by index, so redoing them changes nothing
+                    in_flight = deque(submit(i, s) for i, s, _, _ in in_flight)
+                    continue
+                in_flight.popleft()
+                yield index, size, histogram
+        finally:
+            for _, _, _, future in in_flight:
+                future.cancel()
+
+    async def simulate(
+        self,
+        n: int,
+        seed: int = None,
+        engine: str = "auto",
+        rng_backend: str = None,
+        rules: GameRules = None,
+        window: int = 1,
+    ) -> dict:
+        """
+        Statistics of n games, as from run_simulations.
+
+        The games are drawn in the seeded blocks of run_sharded, so a given
+        (n, seed, engine) gives the same statistics as run_simulations.
+        Call inside admit().
+        """
+        engine = resolve_engine(engine)
+        rng_backend = rng_backend or default_backend(engine)
+        if seed is None:
+            seed = secrets.randbits(64)
+        window = max(1, min(window, self.workers))
+
+        started = time.perf_counter()
+        accumulator = HitAccumulator()
+        blocks = self.blocks(n, seed, engine, rng_backend, rules=rules, window=window)
+        try:
+            async for _, _, histogram in blocks:
+                accumulator.add_histogram(histogram)
+        finally:
+            await blocks.aclose()
+
+        if metrics.ENABLED:
+            elapsed = time.perf_counter() - started
+            metrics.STAGE_SECONDS.observe(elapsed, stage="sampling")
+            metrics.record_simulation(n, elapsed, engine)
+        return accumulator.to_statistics()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "running": min(self.pending, self.workers),
+            "queued": max(self.pending - self.workers, 0),
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "mean_seconds": self.mean_seconds,
+        }
@@ -0,0 +1,229 @@
+"""Multi-core sharded simulation with reproducible per-block seeding"""
+
+import hashlib
+import multiprocessing
+import os
+import secrets
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Tuple
+
+from .progress import ProgressCallback
+from .rng import default_backend, make_rng
+from .rules import GameRules
+from .stats import HitAccumulator
+
+# Games per block. Each block draws from its own stream derived from
+# (seed, block index), so results depend on (n, seed) only, never on how the
+# blocks are spread across workers.
+BLOCK_SIZE = 1 << 16
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def pool_context():
+    """
+    Start method for worker processes.
+
+    Forking a process that runs threads (a server, a warm-up thread) can
+    copy a lock held by another thread into the child and hang it, so
+    workers start from a clean forkserver (spawn where there is none).
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def derive_seed(seed: int, index: int) -> int:
+    """64-bit seed for block `index` of a run seeded with `seed`"""
+    digest = hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def block_sizes(n: int, block_size: int = BLOCK_SIZE) -> List[int]:
+    """Split n games into blocks of block_size (the last one may be shorter)"""
+    full, rest = divmod(n, block_size)
+    return [block_size] * full + ([rest] if rest else [])
+
+
+def simulate_block(
+    engine: str,
+    seed: int,
+    index: int,
+    size: int,
+    keep_raw: bool,
+    rng_backend: str = None,
+    rules: GameRules = None,
+):
+    """Simulate one block with its derived stream, return (histogram, raw)"""
+    rng = make_rng(derive_seed(seed, index), rng_backend or default_backend(engine))
+    if engine == "numpy":
+        from .vectorized import simulate_histogram
+    else:
+        from .core import simulate_histogram
+
+    return simulate_histogram(size, keep_raw=keep_raw, rng=rng, rules=rules)
+
+
+def iter_blocks(
+    n: int,
+    seed: int,
+    engine: str = "numpy",
+    rng_backend: str = None,
+    block_size: int = BLOCK_SIZE,
+    start: int = 0,
+    rules: GameRules = None,
+    workers: int = 1,
+) -> Iterator[Tuple[int, int, List[int]]]:
+    """
+    Simulate the blocks of a seeded run in block order.
+
+    Yields (block index, games in block, histogram) starting at block
+    `start`, so callers can report progress, stop early or resume. The
+    blocks match run_sharded's when block_size is BLOCK_SIZE. With
+    workers > 1 a bounded window of upcoming blocks is computed on the
+    shared process pool while earlier ones are consumed.
+    """
+    sizes = block_sizes(n, block_size)
+    tasks = (
+        (engine, seed, index, sizes[index], False, rng_backend, rules)
+        for index in range(start, len(sizes))
+    )
+    workers = min(workers, os.cpu_count() or 1)
+    if workers <= 1:
+        for task in tasks:
+            histogram, _ = _simulate_task(task)
+            yield task[2], task[3], histogram
+        return
+
+    pool = get_pool(workers)
+    pending = deque()
+    try:
+        for task in tasks:
+            pending.append((task, pool.submit(_simulate_task, task)))
+            if len(pending) >= 2 * workers:
+                task, future = pending.popleft()
+                yield task[2], task[3], future.result()[0]
+        while pending:
+            task, future = pending.popleft()
+            yield task[2], task[3], future.result()[0]
+    except BrokenProcessPool:
+        discard_pool(pool)
+        raise
+    finally:
+        # A caller that stops early leaves upcoming blocks unstarted
+        for _, future in pending:
+            future.cancel()
+
+
+def _simulate_task(task: tuple):
+    return simulate_block(*task)
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """Shared process pool with `workers` processes, created on first use"""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=pool_context()
+            )
+        return pool
+
+
+def discard_pool(pool: ProcessPoolExecutor):
+    """
+    Forget a pool whose worker died (BrokenProcessPool), so the next
+    get_pool starts fresh processes instead of failing forever.
+    """
+    with _pools_lock:
+        for workers, cached in list(_pools.items()):
+            if cached is pool:
+                del _pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def warm_pool(workers: int, engine: str = "numpy") -> int:
+    """
+    Start get_pool(workers)'s processes ahead of the first request.
+
+    Submits one small block per worker at once, so every process is spawned
+    and has imported the engine before real work arrives. Returns the
+    number of processes started.
+    """
+    if workers < 1:
+        return 0
+    pool = get_pool(workers)
+    tasks = [(engine, 0, index, 256, False, None, None) for index in range(workers)]
+    for future in [pool.submit(_simulate_task, task) for task in tasks]:
+        future.result()
+    return workers
+
+
+def shutdown_pools():
+    """Stop every pool started by get_pool"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(cancel_futures=True)
+
+
+def run_sharded(
+    n: int,
+    seed: int = None,
+    workers: int = 1,
+    engine: str = "numpy",
+    keep_raw: bool = False,
+    rng_backend: str = None,
+    rules: GameRules = None,
+    progress: ProgressCallback = None,
+) -> HitAccumulator:
+    """
+    Simulate n games in seeded blocks, optionally across a process pool.
+
+    Block results are merged in block order, so a given (n, seed, engine)
+    gives identical statistics for every worker count.
+
+    Args:
+        n: Number of games
+        seed: Base seed (default: fresh random seed)
+        workers: Number of processes; 1 runs the blocks in this process
+        engine: "python" or "numpy"
+        keep_raw: Also collect every game's hit count, in block order
+        rng_backend: Generator from uboat_game.rng.BACKENDS
+        rules: Game rules (default: the standard game)
+        progress: Called with (games done, n) at the start and after each
+            block
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1, got {workers}")
+    if seed is None:
+        seed = secrets.randbits(64)
+
+    tasks = [
+        (engine, seed, index, size, keep_raw, rng_backend, rules)
+        for index, size in enumerate(block_sizes(n))
+    ]
+    workers = min(workers, len(tasks), os.cpu_count() or 1)
+
+    accumulator = HitAccumulator(keep_raw=keep_raw)
+    if progress is not None:
+        progress(0, n)
+    pool = get_pool(workers) if workers > 1 else None
+    try:
+        if pool is None:
+            results = map(_simulate_task, tasks)
+        else:
+            results = pool.map(_simulate_task, tasks)
+        for histogram, raw_results in results:
+            accumulator.add_histogram(histogram, raw_results)
+            if progress is not None:
+                progress(accumulator.count, n)
+    except BrokenProcessPool:
+        discard_pool(pool)
+        raise
+    return accumulator
@@ -0,0 +1,128 @@
+"""Progress callbacks shared by the simulation engines"""
+
+import logging
+import sys
+import time
+from typing import Callable, Optional, TextIO
+
+# A progress callback gets (games done, games in total). Engines call it
+# once before the first game, then once per chunk of games (never per
+# game), the last time with done == total.
+ProgressCallback = Callable[[int, int], None]
+
+# Seconds between forwarded updates; a terminal or log needs no more
+PROGRESS_INTERVAL = 0.2
+
+
+class Throttle:
+    """
+    Forward progress at most once per `interval` seconds.
+
+    The first and the final update (done == total) are always forwarded,
+    so consumers see the start and the end of every run.
+    """
+
+    __slots__ = ("callback", "interval", "_next")
+
+    def __init__(self, callback: ProgressCallback, interval: float = PROGRESS_INTERVAL):
+        self.callback = callback
+        self.interval = interval
+        self._next = 0.0
+
+    def __call__(self, done: int, total: int):
+        now = time.monotonic()
+        if now >= self._next or done >= total:
+            self._next = now + self.interval
+            self.callback(done, total)
+
+
+def throttle(
+    callback: Optional[ProgressCallback], interval: float = PROGRESS_INTERVAL
+) -> Optional[ProgressCallback]:
+    """callback wrapped in a Throttle; None stays None, so callers can skip it"""
+    if callback is None or isinstance(callback, Throttle):
+        return callback
+    return Throttle(callback, interval)
+
+
+def chain(*callbacks: Optional[ProgressCallback]) -> Optional[ProgressCallback]:
+    """One callback that calls every given (non-None) callback in turn"""
+    callbacks = [c for c in callbacks if c is not None]
+    if len(callbacks) <= 1:
+        return callbacks[0] if callbacks else None
+
+    def report(done: int, total: int):
+        for callback in callbacks:
+            callback(done, total)
+
+    return report
+
+
+class RateMeter:
+    """Games per second and time remaining since the first update"""
+
+    __slots__ = ("started", "first_done")
+
+    def __init__(self):
+        self.started = 0.0
+        self.first_done: Optional[int] = None
+
+    def update(self, done: int, total: int):
+        """(games per second, seconds remaining or None) at `done` games"""
+        if self.first_done is None:
+            # A resumed run starts with games already done; rate the new ones
+            self.started = time.monotonic()
+            self.first_done = done
+        elapsed = time.monotonic() - self.started
+        rate = (done - self.first_done) / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else None
+        return rate, eta
+
+
+class ProgressBar:
+    """Single-line terminal progress bar with rate and time remaining"""
+
+    def __init__(
+        self, label: str = "Simulating", width: int = 30, stream: TextIO = None
+    ):
+        self.label = label
+        self.width = width
+        self.stream = stream or sys.stderr
+        self.meter = RateMeter()
+
+    def __call__(self, done: int, total: int):
+        rate, eta = self.meter.update(done, total)
+        fraction = done / total if total else 1.0
+        filled = int(self.width * fraction)
+        bar = "█" * filled + "·" * (self.width - filled)
+        remaining = f", {eta:.0f}s left" if eta is not None and done < total else ""
+        self.stream.write(
+            f"\r{self.label} [{bar}] {fraction:6.1%} {done:,}/{total:,} "
+            f"({rate:,.0f} games/s{remaining})   "
+        )
+        if done >= total:
+            self.stream.write("\n")
+        self.stream.flush()
+
+
+def log_progress(
+    logger: logging.Logger = None, label: str = "simulation", level: int = logging.INFO
+) -> ProgressCallback:
+    """Callback that writes each update as one log line"""
+    logger = logger or logging.getLogger("uboat_game")
+    meter = RateMeter()
+
+    def report(done: int, total: int):
+        rate, eta = meter.update(done, total)
+        logger.log(
+            level,
+            "%s: %d/%d games (%.1f%%), %.0f games/s, eta %s",
+            label,
+            done,
+            total,
+            100.0 * done / total if total else 100.0,
+            rate,
+            f"{eta:.0f}s" if eta is not None else "-",
+        )
+
+    return report
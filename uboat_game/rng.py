@@ -0,0 +1,189 @@
+"""Pluggable, seedable random number generators for dice rolls"""
+
+import os
+import random
+import threading
+import time
+from typing import List
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# "python" is the stdlib Mersenne Twister; the rest are NumPy bit generators
+BACKENDS = ("python", "pcg64", "philox", "sfc64", "mt19937")
+
+# Chi-square critical values at alpha = 0.001 for the uniformity checks:
+# single faces (6 cells, 5 df) and consecutive pairs (36 cells, 35 df)
+CHI2_CRITICAL_FACES = 20.515
+CHI2_CRITICAL_PAIRS = 66.619
+
+_thread_local = threading.local()
+
+
+class NumpyDice:
+    """
+    Adapter giving a NumPy Generator the randint(a, b) interface of
+    random.Random.
+
+    Single draws are served from a buffer refilled in blocks, so the
+    per-roll cost stays close to one list pop instead of one NumPy call.
+    """
+
+    BUFFER_SIZE = 4096
+
+    def __init__(self, generator: "np.random.Generator"):
+        self.generator = generator
+        self._range = None
+        self._buffer: List[int] = []
+
+    def randint(self, a: int, b: int) -> int:
+        if self._range != (a, b):
+            self._range = (a, b)
+            self._buffer = []
+        if not self._buffer:
+            self._buffer = self.generator.integers(
+                a, b + 1, size=self.BUFFER_SIZE
+            ).tolist()
+        return self._buffer.pop()
+
+
+def make_rng(seed: int = None, backend: str = "python"):
+    """
+    Create a dice generator.
+
+    Args:
+        seed: Seed for a reproducible stream (default: fresh entropy)
+        backend: One of BACKENDS
+
+    Returns:
+        random.Random for "python", otherwise a NumpyDice around a
+        numpy Generator with the named bit generator
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+    if backend == "python":
+        return random.Random(seed)
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy not installed")
+
+    bit_generator = {
+        "pcg64": np.random.PCG64,
+        "philox": np.random.Philox,
+        "sfc64": np.random.SFC64,
+        "mt19937": np.random.MT19937,
+    }[backend]
+    return NumpyDice(np.random.Generator(bit_generator(seed)))
+
+
+def default_backend(engine: str) -> str:
+    """Backend used when none is named: each engine's native generator"""
+    return "pcg64" if engine == "numpy" else "python"
+
+
+def thread_rng() -> random.Random:
+    """Generator private to the calling thread, seeded from os.urandom"""
+    rng = getattr(_thread_local, "rng", None)
+    if rng is None:
+        rng = _thread_local.rng = random.Random(os.urandom(16))
+    return rng
+
+
+def as_numpy_generator(rng) -> "np.random.Generator":
+    """Return a numpy Generator for any supported rng (None = fresh PCG64)"""
+    if rng is None:
+        return np.random.default_rng()
+    if isinstance(rng, NumpyDice):
+        return rng.generator
+    if isinstance(rng, np.random.Generator):
+        return rng
+    # random.Random: seed a PCG64 stream from it so runs stay reproducible
+    return np.random.default_rng(rng.getrandbits(64))
+
+
+def chi_square_faces(rolls: List[int], sides: int = 6) -> float:
+    """Chi-square statistic of face counts against a uniform die"""
+    expected = len(rolls) / sides
+    counts = [0] * sides
+    for roll in rolls:
+        counts[roll - 1] += 1
+    return sum((c - expected) ** 2 / expected for c in counts)
+
+
+def chi_square_pairs(rolls: List[int], sides: int = 6) -> float:
+    """Chi-square statistic of non-overlapping consecutive pairs"""
+    pairs = len(rolls) // 2
+    expected = pairs / sides**2
+    counts = [0] * sides**2
+    for i in range(pairs):
+        counts[(rolls[2 * i] - 1) * sides + rolls[2 * i + 1] - 1] += 1
+    return sum((c - expected) ** 2 / expected for c in counts)
+
+
+def compare_backends(n: int = 1_000_000, seed: int = 12345) -> List[dict]:
+    """
+    Measure dice throughput and run uniformity checks for each backend.
+
+    Returns one row per available backend with rolls per second through
+    randint (the roll_dice path), rolls per second for bulk draws (the
+    vectorized engine path, NumPy backends only) and whether both
+    chi-square checks pass at alpha = 0.001.
+    """
+    rows = []
+    for backend in BACKENDS:
+        if backend != "python" and not NUMPY_AVAILABLE:
+            continue
+        rng = make_rng(seed, backend)
+
+        start = time.perf_counter()
+        rolls = [rng.randint(1, 6) for _ in range(n)]
+        scalar_rate = n / (time.perf_counter() - start)
+
+        bulk_rate = None
+        if backend != "python":
+            generator = as_numpy_generator(rng)
+            start = time.perf_counter()
+            generator.integers(0, 6, size=n, dtype=np.uint8)
+            bulk_rate = n / (time.perf_counter() - start)
+
+        faces = chi_square_faces(rolls)
+        pairs = chi_square_pairs(rolls)
+        rows.append(
+            {
+                "backend": backend,
+                "scalar_rolls_per_sec": scalar_rate,
+                "bulk_rolls_per_sec": bulk_rate,
+                "chi2_faces": faces,
+                "chi2_pairs": pairs,
+                "passed": faces < CHI2_CRITICAL_FACES and pairs < CHI2_CRITICAL_PAIRS,
+            }
+        )
+    return rows
+
+
+def main():
+    """Print the backend throughput comparison"""
+    print(
+        f"\n{'Backend':<10} {'randint/s':>14} {'bulk/s':>16} {'chi2 faces':>11} "
+        f"{'chi2 pairs':>11}  Checks"
+    )
+    print("-" * 76)
+    for row in compare_backends():
+        bulk = (
+            f"{row['bulk_rolls_per_sec']:>16,.0f}"
+            if row["bulk_rolls_per_sec"]
+            else f"{'-':>16}"
+        )
+        print(
+            f"{row['backend']:<10} {row['scalar_rolls_per_sec']:>14,.0f} {bulk} "
+            f"{row['chi2_faces']:>11.2f} {row['chi2_pairs']:>11.2f}  "
+            f"{'pass' if row['passed'] else 'FAIL'}"
+        )
+    print()
+
+
+if __name__ == "__main__":
+    main()
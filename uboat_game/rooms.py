@@ -0,0 +1,92 @@
+"""Asyncio fan-out of game events to every connection in a room"""
+
+import asyncio
+from typing import Dict, List, Set, Tuple
+
+from .encoding import encode_json
+
+# A client that takes longer than this to accept a message is dropped, so
+# one stalled socket cannot hold up a room's broadcast
+SEND_TIMEOUT = 5.0
+
+# WebSocket close codes for dropped members: the send failed (1011,
+# internal error) or timed out (1013, try again later). Either way the
+# client should reconnect.
+CLOSE_SEND_FAILED = 1011
+CLOSE_SEND_TIMEOUT = 1013
+
+
+class RoomHub:
+    """
+    Connections grouped by room, each room one game session.
+
+    A connection is anything with an async send_text(str) and
+    close(code), such as a Starlette WebSocket. Everything runs on the event
+    loop, so no locks are needed. A broadcast encodes its message once and
+    sends it to all members concurrently under one shared deadline; members
+    whose send fails or times out are removed and closed, so their clients
+    notice and reconnect instead of silently missing events.
+    """
+
+    def __init__(self, send_timeout: float = SEND_TIMEOUT):
+        self.send_timeout = send_timeout
+        self._rooms: Dict[str, Set] = {}
+
+    def join(self, room: str, connection):
+        self._rooms.setdefault(room, set()).add(connection)
+
+    def leave(self, room: str, connection):
+        members = self._rooms.get(room)
+        if members is None:
+            return
+        members.discard(connection)
+        if not members:
+            del self._rooms[room]
+
+    async def broadcast(self, room: str, message: dict) -> int:
+        """Send message to every member of room; return how many received it"""
+        members = list(self._rooms.get(room, ()))
+        if not members:
+            return 0
+        text = encode_json(message).decode()
+        sends = [asyncio.ensure_future(c.send_text(text)) for c in members]
+        # One deadline for the whole fan-out rather than a timer per send
+        _, pending = await asyncio.wait(sends, timeout=self.send_timeout)
+        for send in pending:
+            send.cancel()
+
+        delivered = 0
+        dropped = []
+        for connection, send in zip(members, sends):
+            if send in pending:
+                dropped.append((connection, CLOSE_SEND_TIMEOUT))
+            elif send.exception() is not None:
+                dropped.append((connection, CLOSE_SEND_FAILED))
+            else:
+                delivered += 1
+        if dropped:
+            await self._drop(room, dropped)
+        return delivered
+
+    async def _drop(self, room: str, dropped: List[Tuple[object, int]]):
+        """Remove members from room and close them, under the send deadline"""
+        for connection, _ in dropped:
+            self.leave(room, connection)
+        closes = [
+            asyncio.ensure_future(connection.close(code=code))
+            for connection, code in dropped
+        ]
+        done, pending = await asyncio.wait(closes, timeout=self.send_timeout)
+        for close in pending:
+            close.cancel()
+        for close in done:
+            # A socket that is already gone may refuse the close; that is fine
+            close.exception()
+
+    @property
+    def room_count(self) -> int:
+        return len(self._rooms)
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(members) for members in self._rooms.values())
@@ -0,0 +1,131 @@
+"""Configurable game rules shared by every engine, CLI and endpoint"""
+
+import argparse
+from dataclasses import asdict, dataclass
+from typing import Optional, Tuple
+
+from .board import BitBoard, SparseBoard
+
+# Largest board kept as a single-int bitmask; above this a set of hit
+# squares keeps the cost of a game proportional to its rolls
+BITMASK_MAX_SQUARES = 64
+
+
+@dataclass(frozen=True)
+class GameRules:
+    """
+    Board size, number of sonar rolls, re-roll rule and scoring table.
+
+    The die has one face per square, so a roll picks a square 1..squares.
+    The defaults are the standard game: a 2 x 3 board, 5 straight rolls
+    without re-rolls, predictions 1-6 scoring 4/2/1 points for a miss of
+    0/1/2. Rules are immutable and hashable, so they can key caches and be
+    sent to worker processes.
+    """
+
+    rows: int = 2
+    cols: int = 3
+    rolls: int = 5
+    reroll: bool = False
+    points: Tuple[int, ...] = (4, 2, 1)
+
+    def __post_init__(self):
+        if self.rows < 1 or self.cols < 1:
+            raise ValueError(
+                f"board must be at least 1 x 1, got {self.rows} x {self.cols}"
+            )
+        if self.rolls < 1:
+            raise ValueError(f"rolls must be >= 1, got {self.rolls}")
+        if self.reroll and self.rolls > self.squares:
+            raise ValueError(
+                f"with re-rolls, rolls ({self.rolls}) cannot exceed squares "
+                f"({self.squares})"
+            )
+        if not self.points:
+            raise ValueError("points must score at least a perfect prediction")
+        # Accept any sequence (e.g. a JSON list) but store a hashable tuple
+        object.__setattr__(self, "points", tuple(self.points))
+
+    @property
+    def squares(self) -> int:
+        return self.rows * self.cols
+
+    @property
+    def max_hits(self) -> int:
+        return min(self.squares, self.rolls)
+
+    @property
+    def certain_hits(self) -> Optional[int]:
+        """
+        Hits of every game when they are not random, else None: re-rolling
+        until a new square is found always gives `rolls` hits
+        """
+        return self.rolls if self.reroll else None
+
+    @property
+    def predictions(self) -> range:
+        """Valid predictions: 1 up to the number of squares"""
+        return range(1, self.squares + 1)
+
+    @property
+    def is_standard(self) -> bool:
+        return self == STANDARD_RULES
+
+    def score(self, prediction: int, hits: int) -> int:
+        """Points for a prediction: points[|prediction - hits|], else 0"""
+        diff = abs(prediction - hits)
+        return self.points[diff] if diff < len(self.points) else 0
+
+    def coords(self, square: int) -> Tuple[int, int]:
+        """(row, col) of a 1-based square number"""
+        return divmod(square - 1, self.cols)
+
+    def new_board(self):
+        """Empty board: a BitBoard when it fits a bitmask, else a SparseBoard"""
+        if self.squares <= BITMASK_MAX_SQUARES:
+            return BitBoard(self.rows, self.cols)
+        return SparseBoard(self.rows, self.cols)
+
+    def to_dict(self) -> dict:
+        state = asdict(self)
+        state["points"] = list(self.points)
+        return state
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "GameRules":
+        return cls(**state)
+
+
+STANDARD_RULES = GameRules()
+
+
+def add_rules_arguments(parser, defaults: GameRules = STANDARD_RULES):
+    """Add --rows/--cols/--rolls/--[no-]reroll options to an argparse parser"""
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=defaults.rows,
+        help="Board rows (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cols",
+        type=int,
+        default=defaults.cols,
+        help="Board columns (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rolls",
+        type=int,
+        default=defaults.rolls,
+        help="Sonar rolls per game (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--reroll",
+        action=argparse.BooleanOptionalAction,
+        default=defaults.reroll,
+        help="Re-roll squares that are already hit (default: %(default)s)",
+    )
+
+
+def rules_from_args(args) -> GameRules:
+    return GameRules(args.rows, args.cols, args.rolls, args.reroll)
@@ -0,0 +1,250 @@
+"""In-memory multiplayer game sessions with idle expiry"""
+
+import threading
+import time
+import uuid
+from array import array
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+
+from .core import roll_dice
+from .rng import thread_rng
+from .rules import STANDARD_RULES, GameRules
+
+PREDICT = "predict"
+ROLLING = "rolling"
+FINISHED = "finished"
+
+# Boards up to this size are included as a 2D list in snapshots
+BOARD_VIEW_MAX_SQUARES = 100
+
+
+class GameStateError(Exception):
+    """Action not allowed in the session's current phase"""
+
+
+class GameSession:
+    """
+    One multiplayer game, played round by round as in cli_game.
+
+    Each round every player predicts, then the sonar search is rolled one
+    search at a time (or all at once) and the round is scored. Predictions,
+    scores and hits of all rounds live in fixed-size typed arrays allocated
+    up front, so a session's memory does not grow while it is played.
+    Mutating methods hold the session's own lock.
+    """
+
+    __slots__ = (
+        "id",
+        "rules",
+        "rounds",
+        "players",
+        "round",
+        "phase",
+        "board",
+        "searches",
+        "rolls",
+        "predictions",
+        "scores",
+        "hits",
+        "created_at",
+        "last_access",
+        "lock",
+    )
+
+    def __init__(self, players: Sequence[str], rules: GameRules, rounds: int):
+        self.id = uuid.uuid4().hex
+        self.rules = rules
+        self.rounds = rounds
+        self.players = tuple(players)
+        self.round = 0
+        self.phase = PREDICT
+        self.board = rules.new_board()
+        self.searches = 0
+        self.rolls = array("i")
+        # predictions[r * players + p] and scores likewise; 0 = not given
+        self.predictions = array("i", bytes(4 * rounds * len(self.players)))
+        self.scores = array("i", bytes(4 * rounds * len(self.players)))
+        self.hits = array("i", bytes(4 * rounds))
+        self.created_at = time.time()
+        self.last_access = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _slot(self, player: int) -> int:
+        if not 0 <= player < len(self.players):
+            raise ValueError(f"player must be 0-{len(self.players) - 1}, got {player}")
+        return self.round * len(self.players) + player
+
+    def predict(self, player: int, prediction: int):
+        """Record a player's prediction (0-based index) for the current round"""
+        with self.lock:
+            if self.phase != PREDICT:
+                raise GameStateError(f"cannot predict while {self.phase}")
+            if prediction not in self.rules.predictions:
+                low, high = self.rules.predictions[0], self.rules.predictions[-1]
+                raise ValueError(f"prediction must be {low}-{high}, got {prediction}")
+            self.predictions[self._slot(player)] = prediction
+            start = self.round * len(self.players)
+            if all(self.predictions[start : start + len(self.players)]):
+                self.phase = ROLLING
+
+    def roll(self) -> dict:
+        """Perform the next sonar search; the last one scores the round"""
+        with self.lock:
+            return self._roll()
+
+    def search(self) -> List[dict]:
+        """Perform every remaining sonar search of the round"""
+        with self.lock:
+            results = [self._roll()]
+            while self.phase == ROLLING:
+                results.append(self._roll())
+            return results
+
+    def _roll(self) -> dict:
+        if self.phase != ROLLING:
+            raise GameStateError(f"cannot roll while {self.phase}")
+        if self.searches == 0:
+            self.board.reset()
+            del self.rolls[:]
+
+        rng = thread_rng()
+        while True:
+            roll = roll_dice(rng, self.rules.squares)
+            self.rolls.append(roll)
+            new_hit = self.board.hit(roll)
+            if new_hit or not self.rules.reroll:
+                break
+        self.searches += 1
+
+        result = {"search": self.searches, "roll": roll, "new_hit": new_hit}
+        if self.searches == self.rules.rolls:
+            self._score_round()
+        return result
+
+    def _score_round(self):
+        hits = self.board.count()
+        self.hits[self.round] = hits
+        start = self.round * len(self.players)
+        for slot in range(start, start + len(self.players)):
+            self.scores[slot] = self.rules.score(self.predictions[slot], hits)
+        self.searches = 0
+        self.round += 1
+        self.phase = FINISHED if self.round == self.rounds else PREDICT
+
+    def _round_values(self, values: array, r: int) -> List[int]:
+        start = r * len(self.players)
+        return values[start : start + len(self.players)].tolist()
+
+    def totals(self) -> List[int]:
+        return [
+            sum(self.scores[p :: len(self.players)]) for p in range(len(self.players))
+        ]
+
+    def snapshot(self) -> dict:
+        """Phase, board, current predictions and every finished round"""
+        with self.lock:
+            current = min(self.round, self.rounds - 1)
+            board = None
+            if self.rules.squares <= BOARD_VIEW_MAX_SQUARES:
+                board = self.board.to_lists()
+            return {
+                "id": self.id,
+                "phase": self.phase,
+                "round": min(self.round + 1, self.rounds),
+                "rounds": self.rounds,
+                "rules": self.rules.to_dict(),
+                "players": [
+                    {"name": name, "total_score": total}
+                    for name, total in zip(self.players, self.totals())
+                ],
+                "predictions": (
+                    self._round_values(self.predictions, current)
+                    if self.phase != FINISHED
+                    else None
+                ),
+                "searches": self.searches,
+                "rolls": self.rolls.tolist(),
+                "board": board,
+                "hit_count": self.board.count(),
+                "history": [
+                    {
+                        "round": r + 1,
+                        "hits": self.hits[r],
+                        "predictions": self._round_values(self.predictions, r),
+                        "scores": self._round_values(self.scores, r),
+                    }
+                    for r in range(self.round)
+                ],
+            }
+
+
+class SessionStore:
+    """
+    Sessions by id with O(1) lookup, idle expiry and a size bound.
+
+    Sessions are kept in access order: every lookup moves a session to the
+    end, so idle sessions collect at the front and expiry only ever pops
+    from there. When the store is full the least recently used session is
+    dropped to make room.
+    """
+
+    def __init__(self, max_sessions: int = 50000, ttl: float = 1800.0):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, GameSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def create(
+        self, players: Sequence[str], rules: GameRules = None, rounds: int = 5
+    ) -> GameSession:
+        if not players:
+            raise ValueError("need at least one player")
+        if rounds < 1:
+            raise ValueError(f"rounds must be >= 1, got {rounds}")
+        session = GameSession(players, rules or STANDARD_RULES, rounds)
+        with self._lock:
+            self._evict_expired()
+            while len(self._sessions) >= self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+            self._sessions[session.id] = session
+        return session
+
+    def get(self, session_id: str) -> Optional[GameSession]:
+        with self._lock:
+            self._evict_expired()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_access = time.monotonic()
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _evict_expired(self):
+        cutoff = time.monotonic() - self.ttl
+        sessions = self._sessions
+        while sessions:
+            oldest = next(iter(sessions.values()))
+            if oldest.last_access >= cutoff:
+                break
+            sessions.popitem(last=False)
+            self.evicted += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._evict_expired()
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl": self.ttl,
+                "evicted": self.evicted,
+            }
@@ -2,43 +2,64 @@
 
 import argparse
 import json
-from .core import run_simulations
-from .visualizer import plot_hit_distribution, plot_comparison
+import signal
+import sys
+from . import metrics
+from .adaptive import run_until_precision
+from .checkpoint import DEFAULT_INTERVAL, run_checkpointed
+from .core import ENGINES, run_simulations
+from .export import FORMATS, export_games, output_paths, write_sidecar
+from .progress import ProgressBar
+from .rng import BACKENDS
+from .rng import main as compare_rng_main
+from .rules import STANDARD_RULES, GameRules, add_rules_arguments, rules_from_args
+from .theory import theoretical_probabilities
 
 
-def calculate_theoretical_probabilities() -> dict:
+def calculate_theoretical_probabilities(
+    squares: int = 6, rolls: int = 5, reroll: bool = False
+) -> dict:
     """
     Calculate theoretical probabilities using Stirling numbers.
 
-    For 5 dice rolls into 6 squares (with re-rolls):
-    This is equivalent to distributing 5 distinct items into 6 distinct boxes
-    where each box gets at most 1 item.
+    For `rolls` dice rolls onto `squares` squares without re-rolls, the number
+    of unique hits k follows the occupancy distribution
 
-    P(k hits) = (6 choose k) * S(5,k) * k! / 6^5
-    where S(n,k) is Stirling number of second kind
+    P(k hits) = C(squares, k) * k! * S(rolls, k) / squares^rolls
 
-    Simplified: We're looking at unique values in 5 rolls with replacement.
+    where S(n, k) is the Stirling number of the second kind. For the standard
+    game (5 rolls, 6 squares) this gives P(4) = 3600/7776 and P(5) = 720/7776.
+
+    With re-rolls every roll finds a new square, so P(rolls hits) = 1.
     """
-    # Empirically derived (can be calculated combinatorially)
-    # These are approximate theoretical values for 5 rolls
-    theoretical = {
-        1: 0.0032,  # Very rare (all 5 hit same square)
-        2: 0.0617,  # Rare
-        3: 0.3086,  # Common
-        4: 0.4630,  # Most common
-        5: 0.1646,  # Uncommon (all different)
-    }
-    return theoretical
+    certain = GameRules(1, squares, rolls, reroll).certain_hits
+    if certain is not None:
+        return {certain: 1.0}
+    return theoretical_probabilities(squares, rolls)
+
 
+def compare_experimental_vs_theoretical(
+    n: int, engine: str = "auto", experimental: dict = None, rules: GameRules = None
+) -> dict:
+    """
+    Compare simulated probabilities with theory.
+
+    Pass the statistics of an existing run as `experimental` to reuse them;
+    otherwise n new games are simulated. Both use `rules` (default: the
+    standard game).
+    """
+    rules = rules or STANDARD_RULES
+    if experimental is None:
+        experimental = run_simulations(n, engine=engine, rules=rules)
 
-def compare_experimental_vs_theoretical(n: int) -> dict:
-    """Run simulations and compare with theory"""
-    experimental = run_simulations(n)
-    theoretical = calculate_theoretical_probabilities()
+    with metrics.STAGE_SECONDS.time(stage="compare"):
+        theoretical = calculate_theoretical_probabilities(
+            rules.squares, rules.rolls, rules.reroll
+        )
 
-    # Normalize experimental to ensure all keys 1-6 exist
-    exp_probs = {k: 0.0 for k in range(1, 7)}
-    exp_probs.update(experimental["probabilities"])
+        # Normalize experimental to ensure every reachable hit count exists
+        exp_probs = {k: 0.0 for k in range(1, rules.max_hits + 1)}
+        exp_probs.update(experimental["probabilities"])
 
     comparison = {
         "experimental": exp_probs,
@@ -59,13 +80,192 @@ def main():
         "--output", type=str, default="simulation_results.json", help="Output JSON file"
     )
     parser.add_argument("--chart", action="store_true", help="Generate chart images")
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="auto",
+        help="Simulation engine (default: auto = numpy when installed)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Worker processes (default: 1)"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Seed for a reproducible run"
+    )
+    parser.add_argument(
+        "--rng",
+        choices=BACKENDS,
+        default=None,
+        help="Random number generator (default: the engine's native one)",
+    )
+    parser.add_argument(
+        "--precision",
+        type=float,
+        default=None,
+        help="Instead of --runs, simulate until every CI half-width is below this",
+    )
+    parser.add_argument(
+        "--relative-error",
+        type=float,
+        default=None,
+        help="Instead of --runs, simulate until every CI is within this fraction",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="Confidence level for --precision/--relative-error (default: 0.95)",
+    )
+    parser.add_argument(
+        "--max-runs",
+        type=int,
+        default=10_000_000,
+        help="Upper limit for --precision/--relative-error (default: 10000000)",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=FORMATS,
+        default="json",
+        help="json: statistics only; npy/raw: also every game's hits as a "
+        "packed array next to a JSON sidecar (default: json)",
+    )
+    parser.add_argument(
+        "--save-rolls",
+        action="store_true",
+        help="With --output-format npy/raw, also write every game's rolls",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        metavar="PATH",
+        help="Save progress to PATH periodically (default with --resume: "
+        "<output>.checkpoint)",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help=f"Seconds between checkpoints (default: {DEFAULT_INTERVAL:g})",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue from the checkpoint if one exists",
+    )
+    parser.add_argument(
+        "--progress",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Show a progress bar (default: when stderr is a terminal)",
+    )
+    add_rules_arguments(parser)
+    parser.add_argument(
+        "--compare-rng",
+        action="store_true",
+        help="Print generator throughput and uniformity checks, then exit",
+    )
 
     args = parser.parse_args()
 
-    print(f"\n🎲 Running {args.runs} simulations...")
+    if args.compare_rng:
+        compare_rng_main()
+        return
+
+    try:
+        rules = rules_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    adaptive = args.precision is not None or args.relative_error is not None
+    show_progress = sys.stderr.isatty() if args.progress is None else args.progress
+    progress = ProgressBar() if show_progress else None
+    export = args.output_format != "json"
+    if export and adaptive:
+        parser.error("--output-format npy/raw needs a fixed --runs")
+    if export and (args.workers != 1 or args.engine == "python"):
+        # Every game's rolls come from the numpy batches of one process
+        parser.error("--output-format npy/raw runs on the numpy engine in one process")
+    if args.save_rolls and (not export or rules.reroll):
+        parser.error("--save-rolls needs --output-format npy/raw and no re-rolls")
+    checkpoint = args.checkpoint
+    if args.resume and checkpoint is None:
+        checkpoint = f"{args.output}.checkpoint"
+    if checkpoint and (adaptive or export):
+        parser.error("--checkpoint/--resume need a fixed --runs and JSON output")
 
-    stats = run_simulations(args.runs)
-    comparison = compare_experimental_vs_theoretical(args.runs)
+    paths = (
+        output_paths(args.output, args.output_format, args.save_rolls)
+        if export
+        else None
+    )
+    metadata = None
+    if adaptive:
+        print("\n🎲 Running simulations until the precision target is met...")
+        stats = run_until_precision(
+            half_width=args.precision,
+            relative_error=args.relative_error,
+            confidence=args.confidence,
+            max_runs=args.max_runs,
+            seed=args.seed,
+            engine=args.engine,
+            rules=rules,
+            workers=args.workers,
+            rng_backend=args.rng,
+            progress=progress,
+        )
+        precision = stats["precision"]
+        status = "target met" if precision["converged"] else "max runs reached"
+        print(
+            f"Stopped after {stats['n_simulations']:,} simulations ({status}, "
+            f"mean ±{precision['mean_half_width']:.4f})"
+        )
+    elif checkpoint:
+        # Preemption usually arrives as SIGTERM: exit through Python so the
+        # checkpoint is written on the way out
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+        print(f"\n🎲 Running {args.runs} simulations, checkpointing to {checkpoint}...")
+        stats = run_checkpointed(
+            args.runs,
+            checkpoint,
+            seed=args.seed,
+            engine=args.engine,
+            workers=args.workers,
+            rng_backend=args.rng,
+            rules=rules,
+            resume=args.resume,
+            interval=args.checkpoint_interval,
+            progress=progress,
+        )
+        if stats["resumed_from"]:
+            print(f"Resumed after {stats['resumed_from']:,} simulations")
+    elif export:
+        print(f"\n🎲 Running {args.runs} simulations, streaming to {paths['hits']}...")
+        metadata = export_games(
+            args.output,
+            args.runs,
+            args.output_format,
+            seed=args.seed,
+            rules=rules,
+            rolls=args.save_rolls,
+            rng_backend=args.rng,
+            progress=progress,
+        )
+        stats = metadata["statistics"]
+    else:
+        print(f"\n🎲 Running {args.runs} simulations...")
+        stats = run_simulations(
+            args.runs,
+            engine=args.engine,
+            seed=args.seed,
+            workers=args.workers,
+            rng_backend=args.rng,
+            rules=rules,
+            progress=progress,
+        )
+
+    comparison = compare_experimental_vs_theoretical(
+        stats["n_simulations"], experimental=stats, rules=rules
+    )
 
     # Display results
     print(f"\n{'='*60}")
@@ -82,28 +282,36 @@ def main():
     print(f"{'Hits':<10} {'Count':<12} {'Probability':<15} {'Theoretical':<15}")
     print(f"{'-'*60}")
 
-    for hits in range(1, 7):
+    for hits in range(1, rules.max_hits + 1):
         count = stats["hit_distribution"].get(hits, 0)
         exp_prob = stats["probabilities"].get(hits, 0.0)
         theo_prob = comparison["theoretical"].get(hits, 0.0)
+        if not count and theo_prob < 5e-5:
+            continue  # Would print as zeros; keeps large boards readable
         print(f"{hits:<10} {count:<12} {exp_prob:<15.4f} {theo_prob:<15.4f}")
 
     print(f"{'='*60}\n")
 
-    # Save to JSON
-    output_data = {"statistics": stats, "comparison": comparison}
+    if export:
+        metadata["comparison"] = comparison
+        write_sidecar(paths["sidecar"], metadata)
+        files = [paths["hits"], paths["rolls"], paths["sidecar"]]
+        print(f"✅ Results saved to {', '.join(f for f in files if f)}")
+    else:
+        # Save to JSON
+        output_data = {"statistics": stats, "comparison": comparison}
 
-    # Remove raw results for cleaner JSON
-    output_data["statistics"].pop("raw_results", None)
+        with metrics.STAGE_SECONDS.time(stage="serialization"):
+            with open(args.output, "w") as f:
+                json.dump(output_data, f, indent=2)
 
-    with open(args.output, "w") as f:
-        json.dump(output_data, f, indent=2)
-
-    print(f"✅ Results saved to {args.output}")
+        print(f"✅ Results saved to {args.output}")
 
     # Generate charts if requested
     if args.chart:
         try:
+            from .visualizer import plot_comparison, plot_hit_distribution
+
             plot_hit_distribution(stats, "hit_distribution.png")
             plot_comparison(comparison, "probability_comparison.png")
             print(f"✅ Charts saved: hit_distribution.png, probability_comparison.png")
@@ -0,0 +1,140 @@
+"""Streaming, mergeable statistics over simulated hit counts"""
+
+from typing import Iterable, List, Optional
+
+
+class HitAccumulator:
+    """
+    One-pass statistics for per-game hit counts.
+
+    Keeps the hit histogram, the sample count and the running mean and sum of
+    squared deviations (Welford). Median, mode and quantiles are read from
+    the histogram, so no raw results are needed unless keep_raw is set.
+    Accumulators from separate chunks, workers or resumed runs combine with
+    merge() without re-scanning any data.
+    """
+
+    def __init__(self, keep_raw: bool = False):
+        self.histogram: List[int] = [0] * 7
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.raw_results: Optional[List[int]] = [] if keep_raw else None
+
+    def _grow(self, size: int):
+        if size > len(self.histogram):
+            self.histogram.extend([0] * (size - len(self.histogram)))
+
+    def _combine(self, count: int, mean: float, m2: float):
+        """Merge another sample's moments (Chan et al. parallel update)"""
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def add(self, hits: int):
+        """Record a single game (Welford update)"""
+        self._grow(hits + 1)
+        self.histogram[hits] += 1
+        self.count += 1
+        delta = hits - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (hits - self.mean)
+        if self.raw_results is not None:
+            self.raw_results.append(hits)
+
+    def add_histogram(self, counts: List[int], raw_results: Iterable[int] = None):
+        """Record a batch of games given as counts[k] = games with k hits"""
+        count = sum(counts)
+        if count == 0:
+            return
+        mean = sum(k * c for k, c in enumerate(counts)) / count
+        m2 = sum(c * (k - mean) ** 2 for k, c in enumerate(counts) if c)
+
+        self._grow(len(counts))
+        for k, c in enumerate(counts):
+            self.histogram[k] += c
+        self._combine(count, mean, m2)
+
+        if self.raw_results is not None and raw_results is not None:
+            self.raw_results.extend(raw_results)
+
+    def merge(self, other: "HitAccumulator") -> "HitAccumulator":
+        """Fold another accumulator into this one and return self"""
+        self._grow(len(other.histogram))
+        for k, c in enumerate(other.histogram):
+            self.histogram[k] += c
+        self._combine(other.count, other.mean, other.m2)
+        if self.raw_results is not None and other.raw_results is not None:
+            self.raw_results.extend(other.raw_results)
+        return self
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std_dev(self) -> float:
+        return self.variance**0.5
+
+    def quantile(self, q: float) -> Optional[int]:
+        """Hit count at sorted index int(q * count), clamped to the last game"""
+        if not self.count:
+            return None
+        index = min(int(q * self.count), self.count - 1)
+        cumulative = 0
+        for k, c in enumerate(self.histogram):
+            cumulative += c
+            if cumulative > index:
+                return k
+        return None
+
+    @property
+    def median(self) -> Optional[int]:
+        return self.quantile(0.5)
+
+    @property
+    def mode(self) -> Optional[int]:
+        if not self.count:
+            return None
+        return max(range(len(self.histogram)), key=self.histogram.__getitem__)
+
+    def hit_distribution(self) -> dict:
+        return {k: c for k, c in enumerate(self.histogram) if c}
+
+    def to_statistics(self) -> dict:
+        """Statistics dict in the shape returned by run_simulations"""
+        hit_counts = self.hit_distribution()
+        stats = {
+            "n_simulations": self.count,
+            "hit_distribution": hit_counts,
+            "mean_hits": self.mean,
+            "median_hits": self.median,
+            "mode_hits": self.mode,
+            "std_dev": self.std_dev,
+            "probabilities": {k: c / self.count for k, c in hit_counts.items()},
+        }
+        if self.raw_results is not None:
+            stats["raw_results"] = self.raw_results
+        return stats
+
+    def to_dict(self) -> dict:
+        """JSON-serializable state (raw results are not included)"""
+        return {
+            "histogram": list(self.histogram),
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "HitAccumulator":
+        acc = cls()
+        acc.histogram = list(state["histogram"])
+        acc.count = state["count"]
+        acc.mean = state["mean"]
+        acc.m2 = state["m2"]
+        return acc
@@ -0,0 +1,200 @@
+"""Expected score of every prediction for a given hit distribution"""
+
+import argparse
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+from .rules import STANDARD_RULES, GameRules, add_rules_arguments, rules_from_args
+from .theory import occupancy_distribution
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+def exact_distribution(rules: GameRules = None) -> Tuple[float, ...]:
+    """P(k hits) for k = 0..rules.max_hits under `rules`"""
+    rules = rules or STANDARD_RULES
+    if rules.certain_hits is not None:
+        return tuple(float(k == rules.certain_hits) for k in range(rules.max_hits + 1))
+    distribution = occupancy_distribution(rules.squares, rules.rolls)
+    return tuple(float(p) for p in distribution)
+
+
+def _as_sequence(probabilities, size: int) -> Tuple[float, ...]:
+    """Dense tuple p[0..size-1] from a {hits: p} mapping or a sequence"""
+    if isinstance(probabilities, dict):
+        dense = [0.0] * size
+        for k, p in probabilities.items():
+            k = int(k)  # JSON object keys arrive as strings
+            if not 0 <= k < size:
+                raise ValueError(f"hit count {k} is outside 0..{size - 1}")
+            dense[k] = float(p)
+        return tuple(dense)
+    if len(probabilities) > size:
+        raise ValueError(f"got {len(probabilities)} probabilities, need <= {size}")
+    return tuple(map(float, probabilities)) + (0.0,) * (size - len(probabilities))
+
+
+def _distribution(rules: GameRules, probabilities) -> Tuple[float, ...]:
+    if probabilities is None:
+        return exact_distribution(rules)
+    return _as_sequence(probabilities, rules.max_hits + 1)
+
+
+def _band_sums(p: Sequence[float], weights: Sequence[float], predictions: int):
+    """
+    sum_d weights[d] * (p[j - d] + p[j + d]) for j = 1..predictions (d = 0
+    counted once), with p zero outside its range.
+
+    This is row j of the score matrix times the distribution: the matrix is
+    banded because a miss of len(points) or more scores nothing, so the
+    product is a correlation with the symmetric kernel of the points table.
+    """
+    kernel = np.concatenate([weights[:0:-1], weights])
+    width = len(weights) - 1
+    padded = np.zeros(predictions + 1 + 2 * width)
+    padded[width : width + min(len(p), predictions + 1 + width)] = p[
+        : predictions + 1 + width
+    ]
+    return np.correlate(padded, kernel, mode="valid")[1 : predictions + 1]
+
+
+def _band_sums_python(p: Sequence[float], weights: Sequence[float], predictions: int):
+    sums = []
+    for j in range(1, predictions + 1):
+        total = 0.0
+        for d, w in enumerate(weights):
+            if not w:
+                continue
+            if j - d >= 0 and j - d < len(p):
+                total += w * p[j - d]
+            if d and j + d < len(p):
+                total += w * p[j + d]
+        sums.append(total)
+    return sums
+
+
+# Tables hold a few floats per prediction, so a 1000 x 1000 board costs tens
+# of MB: keep only a handful
+@lru_cache(maxsize=16)
+def _score_table(rules: GameRules, probabilities: Tuple[float, ...]) -> tuple:
+    """
+    (expected, second moment, {score: P(score)}) as arrays indexed by
+    prediction - 1, and the best prediction, memoized
+    """
+    predictions = len(rules.predictions)
+    values = sorted(set(rules.points) - {0}, reverse=True)
+    band = _band_sums if NUMPY_AVAILABLE else _band_sums_python
+    if NUMPY_AVAILABLE:
+        probabilities = np.asarray(probabilities)
+
+    points = list(rules.points)
+    expected = band(probabilities, [float(v) for v in points], predictions)
+    second = band(probabilities, [float(v * v) for v in points], predictions)
+    # P(score = v) for every non-zero score: the band sum of its indicator
+    score_probs = {
+        v: band(probabilities, [float(x == v) for x in points], predictions)
+        for v in values
+    }
+    # First maximum, i.e. the lowest prediction on ties
+    if NUMPY_AVAILABLE:
+        best = int(np.argmax(expected)) + 1
+    else:
+        best = max(range(predictions), key=expected.__getitem__) + 1
+    return expected, second, score_probs, best
+
+
+def _ranked(expected, top: int) -> List[int]:
+    """Indices of the `top` highest expected scores, lowest index on ties"""
+    if NUMPY_AVAILABLE:
+        return np.argsort(-expected, kind="stable")[:top].tolist()
+    return sorted(range(len(expected)), key=lambda i: -expected[i])[:top]
+
+
+def score_table(rules: GameRules = None, probabilities=None, top: int = None) -> dict:
+    """
+    Expected points, variance and score distribution for every prediction.
+
+    The expected score of prediction j is row j of the points matrix
+    S[j, k] = rules.score(j, k) times the hit distribution. It is computed
+    as one banded matrix-vector product, so any board size and scoring table
+    costs O(predictions * len(points)). Tables are memoized per (rules,
+    distribution), so repeated lookups are free.
+
+    Args:
+        rules: Game rules (default: the standard game)
+        probabilities: Hit distribution as {hits: p} (e.g. the
+            "probabilities" of run_simulations) or a sequence p[k]; default
+            the exact distribution for `rules`
+        top: Only the `top` predictions with the highest expected score,
+            best first (default: every prediction in order)
+
+    Returns:
+        Dict with the rules, the distribution source, per prediction the
+        expected score, variance, standard deviation and score distribution,
+        and the prediction with the highest expected score
+    """
+    rules = rules or STANDARD_RULES
+    source = "exact" if probabilities is None else "given"
+    expected, second, score_probs, best = _score_table(
+        rules, _distribution(rules, probabilities)
+    )
+    indices = range(len(expected)) if top is None else _ranked(expected, top)
+    table: Dict[int, dict] = {}
+    for i in indices:
+        distribution = {v: float(p[i]) for v, p in score_probs.items()}
+        distribution[0] = max(1.0 - sum(distribution.values()), 0.0)
+        mean = float(expected[i])
+        variance = max(float(second[i]) - mean * mean, 0.0)
+        table[i + 1] = {
+            "expected_score": mean,
+            "variance": variance,
+            "std_dev": variance**0.5,
+            "score_distribution": {v: p for v, p in distribution.items() if p},
+        }
+    return {
+        "rules": rules.to_dict(),
+        "source": source,
+        "predictions": table,
+        "best_prediction": best,
+        "best_expected_score": float(expected[best - 1]),
+    }
+
+
+def optimal_prediction(rules: GameRules = None, probabilities=None) -> int:
+    """Prediction with the highest expected score (lowest on ties)"""
+    rules = rules or STANDARD_RULES
+    return _score_table(rules, _distribution(rules, probabilities))[3]
+
+
+def main():
+    """Print the expected-score table for a rule set"""
+    parser = argparse.ArgumentParser(description="U-Boat prediction strategy table")
+    add_rules_arguments(parser)
+    parser.add_argument(
+        "--top", type=int, default=10, help="Show the best N predictions (default: 10)"
+    )
+    args = parser.parse_args()
+    try:
+        rules = rules_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    result = score_table(rules, top=args.top)
+
+    print(f"\n{'Prediction':<12} {'Expected':<12} {'Std dev':<12}")
+    print("-" * 36)
+    for p, row in result["predictions"].items():
+        print(f"{p:<12} {row['expected_score']:<12.4f} {row['std_dev']:<12.4f}")
+    print(
+        f"\nBest prediction: {result['best_prediction']} "
+        f"({result['best_expected_score']:.4f} points expected)\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
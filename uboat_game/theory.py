@@ -0,0 +1,201 @@
+"""Exact hit distributions for sonar searches without re-rolls"""
+
+import json
+import os
+import tempfile
+from fractions import Fraction
+from functools import lru_cache
+from math import comb, factorial
+from typing import Dict, Optional, Tuple
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Environment variable naming a directory that persists computed
+# distributions, one JSON file each
+CACHE_ENV_VAR = "UBOAT_THEORY_CACHE"
+
+# Most distributions kept in the cache directory; the oldest are dropped first
+MAX_DISK_ENTRIES = 512
+
+# Probabilities below this are dropped from the float DP window
+TAIL_CUTOFF = 1e-40
+
+
+@lru_cache(maxsize=256)
+def stirling2_row(n: int) -> Tuple[int, ...]:
+    """
+    Stirling numbers of the second kind S(n, k) for k = 0..n.
+
+    S(n, k) counts the ways to partition n rolls into k non-empty groups,
+    built row by row from S(n, k) = k * S(n-1, k) + S(n-1, k-1).
+    """
+    row = [1]  # S(0, 0)
+    for i in range(1, n + 1):
+        row = [0] + [k * (row[k] if k < i else 0) + row[k - 1] for k in range(1, i + 1)]
+    return tuple(row)
+
+
+def _exact_distribution(squares: int, rolls: int) -> Tuple[Fraction, ...]:
+    """P(k hits) = C(squares, k) * k! * S(rolls, k) / squares^rolls"""
+    stirling = stirling2_row(rolls)
+    total = squares**rolls
+    return tuple(
+        Fraction(comb(squares, k) * factorial(k) * stirling[k], total)
+        for k in range(min(squares, rolls) + 1)
+    )
+
+
+def _float_distribution(squares: int, rolls: int) -> Tuple[float, ...]:
+    """
+    Occupancy distribution by dynamic programming over the rolls.
+
+    After each roll, k hit squares stay at k with probability k / squares and
+    grow to k + 1 with probability (squares - k) / squares. All terms are
+    positive, so the recurrence is numerically stable for any size.
+    """
+    size = min(squares, rolls) + 1
+
+    if NUMPY_AVAILABLE:
+        k = np.arange(size, dtype=np.float64)
+        stay = k / squares
+        grow = (squares - k) / squares
+        p = np.zeros(size)
+        p[0] = 1.0
+        # Only p[lo..hi] carries mass above TAIL_CUTOFF. The window follows
+        # the bulk of the distribution, so each roll costs O(sqrt(rolls))
+        # instead of O(squares) and large boards stay in the millisecond range
+        lo, hi = 0, 0
+        for _ in range(rolls):
+            if hi < size - 1 and p[hi] >= TAIL_CUTOFF:
+                hi += 1
+            p[lo + 1 : hi + 1] = (
+                p[lo + 1 : hi + 1] * stay[lo + 1 : hi + 1] + p[lo:hi] * grow[lo:hi]
+            )
+            p[lo] *= stay[lo]
+            while lo < hi and p[lo] < TAIL_CUTOFF:
+                p[lo] = 0.0
+                lo += 1
+        return tuple(p.tolist())
+
+    p = [1.0] + [0.0] * (size - 1)
+    for _ in range(rolls):
+        p = [0.0] + [
+            p[k] * k / squares + p[k - 1] * (squares - k + 1) / squares
+            for k in range(1, size)
+        ]
+    return tuple(p)
+
+
+def _cache_file(key: str) -> Optional[str]:
+    directory = os.environ.get(CACHE_ENV_VAR)
+    return os.path.join(directory, f"{key}.json") if directory else None
+
+
+def _load_disk_cache(key: str) -> Optional[list]:
+    """
+    One persisted distribution, or None. Files are only ever replaced
+    whole, so reading needs no lock and never waits for a writer.
+    """
+    path = _cache_file(key)
+    if path is None:
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _evict_disk_cache(directory: str):
+    """Remove the oldest cache files beyond MAX_DISK_ENTRIES"""
+    entries = [e for e in os.scandir(directory) if e.name.endswith(".json")]
+    if len(entries) <= MAX_DISK_ENTRIES:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for entry in entries[: len(entries) - MAX_DISK_ENTRIES]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass  # Another process evicted it first
+
+
+def _store_disk_cache(key: str, values: list):
+    """
+    Persist one distribution in its own file, best effort.
+
+    The file is replaced atomically from a unique temporary file, so readers
+    never see a partial file and writers of other entries are not held up;
+    an unwritable directory only means results are not persisted.
+    """
+    path = _cache_file(key)
+    if path is None:
+        return
+    directory = os.path.dirname(path)
+    tmp_path = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(values, f)
+        os.replace(tmp_path, path)
+        tmp_path = None
+        _evict_disk_cache(directory)
+    except OSError:
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+@lru_cache(maxsize=1024)
+def occupancy_distribution(
+    squares: int = 6, rolls: int = 5, exact: bool = False
+) -> tuple:
+    """
+    Distribution of unique hits when `rolls` uniform rolls land on `squares`.
+
+    Args:
+        squares: Number of board squares (die faces)
+        rolls: Number of sonar rolls, no re-rolls
+        exact: Return Fractions instead of floats
+
+    Returns:
+        Tuple p where p[k] = P(k unique hits), k = 0..min(squares, rolls)
+
+    Results are memoized in memory and, when the UBOAT_THEORY_CACHE
+    environment variable names a directory, persisted there between runs.
+    """
+    if squares < 1 or rolls < 0:
+        raise ValueError(f"need squares >= 1 and rolls >= 0, got {squares}, {rolls}")
+
+    key = f"{squares}-{rolls}-{'exact' if exact else 'float'}"
+    cached = _load_disk_cache(key)
+    if cached is not None:
+        if exact:
+            return tuple(
+                Fraction(*(int(part, 16) for part in v.split("/"))) for v in cached
+            )
+        return tuple(cached)
+
+    if exact:
+        distribution = _exact_distribution(squares, rolls)
+        # Hex keeps huge numerators clear of the int-to-str digit limit
+        _store_disk_cache(
+            key, [f"{v.numerator:x}/{v.denominator:x}" for v in distribution]
+        )
+    else:
+        distribution = _float_distribution(squares, rolls)
+        _store_disk_cache(key, list(distribution))
+    return distribution
+
+
+def theoretical_probabilities(squares: int = 6, rolls: int = 5) -> Dict[int, float]:
+    """P(k hits) for every reachable k >= 1, keyed by hit count"""
+    distribution = occupancy_distribution(squares, rolls)
+    return {k: float(p) for k, p in enumerate(distribution) if k >= 1}
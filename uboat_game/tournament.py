@@ -0,0 +1,314 @@
+"""Headless multiplayer tournaments between prediction strategies"""
+
+import argparse
+import json
+import os
+import secrets
+from typing import Callable, Dict, List, Sequence
+
+from .parallel import BLOCK_SIZE, block_sizes, derive_seed, get_pool
+from .rng import as_numpy_generator, make_rng
+from .rules import STANDARD_RULES, GameRules, add_rules_arguments, rules_from_args
+from .stats import HitAccumulator
+from .strategy import exact_distribution, optimal_prediction
+from .vectorized import NUMPY_AVAILABLE, iter_hit_batches
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+# Rounds per game, as in cli_game.main
+ROUNDS = 5
+
+# A strategy predicts one round for a batch of games. It gets the hits of
+# the rounds played so far, shape (games, rounds so far), and the block's
+# numpy Generator, and returns one prediction per game.
+Strategy = Callable[["np.ndarray", "np.random.Generator"], "np.ndarray"]
+
+
+def _constant(value: int) -> Strategy:
+    def predict(history, rng):
+        return np.full(len(history), value)
+
+    return predict
+
+
+def _optimal(rules: GameRules) -> Strategy:
+    """Always the prediction with the highest expected score"""
+    return _constant(optimal_prediction(rules))
+
+
+def _mean(rules: GameRules) -> Strategy:
+    """Always the expected number of hits, rounded"""
+    distribution = exact_distribution(rules)
+    mean = sum(k * p for k, p in enumerate(distribution))
+    return _constant(min(max(round(mean), 1), rules.predictions[-1]))
+
+
+def _random(rules: GameRules) -> Strategy:
+    """Uniform over the valid predictions"""
+    low, high = rules.predictions[0], rules.predictions[-1]
+
+    def predict(history, rng):
+        return rng.integers(low, high + 1, size=len(history))
+
+    return predict
+
+
+def _last(rules: GameRules) -> Strategy:
+    """Previous round's hits; the optimal prediction in round one"""
+    first = optimal_prediction(rules)
+
+    def predict(history, rng):
+        if not history.shape[1]:
+            return np.full(len(history), first)
+        return np.maximum(history[:, -1], 1)
+
+    return predict
+
+
+def _adaptive(rules: GameRules) -> Strategy:
+    """
+    Most frequent hit count of the rounds so far (latest wins ties); the
+    optimal prediction in round one.
+    """
+    first = optimal_prediction(rules)
+
+    def predict(history, rng):
+        if not history.shape[1]:
+            return np.full(len(history), first)
+        best = history[:, 0].copy()
+        best_count = np.zeros(len(history), dtype=np.int64)
+        # O(rounds^2) comparisons, independent of the number of hit values
+        for j in range(history.shape[1]):
+            count = (history == history[:, j : j + 1]).sum(axis=1)
+            better = count >= best_count
+            best[better] = history[better, j]
+            best_count[better] = count[better]
+        return np.maximum(best, 1)
+
+    return predict
+
+
+STRATEGIES: Dict[str, Callable[[GameRules], Strategy]] = {
+    "optimal": _optimal,
+    "mean": _mean,
+    "random": _random,
+    "last": _last,
+    "adaptive": _adaptive,
+}
+
+
+def make_strategy(name: str, rules: GameRules = None) -> Strategy:
+    """Strategy from a STRATEGIES name or "fixed:K" (always predict K)"""
+    rules = rules or STANDARD_RULES
+    if name.startswith("fixed:"):
+        value = int(name.split(":", 1)[1])
+        if value not in rules.predictions:
+            raise ValueError(f"fixed prediction {value} is not a valid prediction")
+        return _constant(value)
+    if name not in STRATEGIES:
+        raise ValueError(
+            f"unknown strategy {name!r}; choose from {sorted(STRATEGIES)} or fixed:K"
+        )
+    return STRATEGIES[name](rules)
+
+
+class PlayerTally:
+    """Results of one strategy seat, merged block by block"""
+
+    __slots__ = ("name", "strategy", "wins", "ties", "scores")
+
+    def __init__(self, name: str, strategy: str):
+        self.name = name
+        self.strategy = strategy
+        self.wins = 0
+        self.ties = 0
+        # Histogram of total game scores; mean, spread and quantiles come
+        # from it without keeping any per-game lists
+        self.scores = HitAccumulator()
+
+    def to_dict(self, games: int) -> dict:
+        scores = self.scores
+        return {
+            "name": self.name,
+            "strategy": self.strategy,
+            "win_probability": self.wins / games,
+            "tie_probability": self.ties / games,
+            "mean_score": scores.mean,
+            "std_dev": scores.std_dev,
+            "median_score": scores.median,
+            "score_distribution": {
+                s: c / games for s, c in scores.hit_distribution().items()
+            },
+        }
+
+
+def play_block(
+    rules: GameRules,
+    strategies: Sequence[str],
+    rounds: int,
+    seed: int,
+    index: int,
+    size: int,
+):
+    """
+    Play `size` complete games of block `index` and tally every seat.
+
+    All seats predict the same sonar search each round, as at the table.
+    Scores are computed for every seat, game and round at once.
+
+    Returns:
+        (wins, ties, score histograms) per seat, and the number of games
+        whose top score was shared
+    """
+    rng = as_numpy_generator(make_rng(derive_seed(seed, index), "pcg64"))
+    hits = np.concatenate(list(iter_hit_batches(size * rounds, rng=rng, rules=rules)))
+    hits = hits.astype(np.int64).reshape(size, rounds)
+
+    predict = [make_strategy(name, rules) for name in strategies]
+    predictions = np.empty((len(strategies), size, rounds), dtype=np.int64)
+    for r in range(rounds):
+        history = hits[:, :r]
+        for seat, strategy in enumerate(predict):
+            predictions[seat, :, r] = strategy(history, rng)
+
+    # points[|prediction - hits|], with every larger miss mapped to 0 points
+    lookup = np.array(rules.points + (0,), dtype=np.int64)
+    misses = np.minimum(np.abs(predictions - hits), len(rules.points))
+    totals = lookup[misses].sum(axis=2)
+
+    at_best = totals == totals.max(axis=0)
+    shared = at_best.sum(axis=0) > 1
+    wins = (at_best & ~shared).sum(axis=1)
+    ties = (at_best & shared).sum(axis=1)
+    histograms = [np.bincount(seat_totals).tolist() for seat_totals in totals]
+    return wins.tolist(), ties.tolist(), histograms, int(shared.sum())
+
+
+def _play_task(task: tuple):
+    return play_block(*task)
+
+
+def run_tournament(
+    games: int,
+    strategies: Sequence[str] = ("optimal", "random", "adaptive"),
+    rounds: int = ROUNDS,
+    seed: int = None,
+    workers: int = 1,
+    rules: GameRules = None,
+) -> dict:
+    """
+    Play `games` full games between one seat per strategy.
+
+    Games are played in seeded blocks, optionally across a process pool, so
+    a given (games, strategies, rounds, seed, rules) gives identical results
+    for every worker count.
+
+    Args:
+        games: Number of complete games
+        strategies: One entry per seat: STRATEGIES names or "fixed:K"
+        rounds: Rounds per game
+        seed: Base seed (default: fresh random seed)
+        workers: Number of processes; 1 plays every block in this process
+        rules: Game rules (default: the standard game)
+
+    Returns:
+        Per seat the win and tie probabilities and the distribution of total
+        scores, and the share of games with a tied top score
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy not installed")
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1, got {workers}")
+    rules = rules or STANDARD_RULES
+    strategies = list(strategies)
+    for name in strategies:
+        make_strategy(name, rules)  # Fail here rather than in a worker
+    if seed is None:
+        seed = secrets.randbits(64)
+
+    tasks = [
+        (rules, strategies, rounds, seed, index, size)
+        for index, size in enumerate(block_sizes(games, BLOCK_SIZE))
+    ]
+    workers = min(workers, len(tasks), os.cpu_count() or 1)
+    if workers <= 1:
+        results = map(_play_task, tasks)
+    else:
+        results = get_pool(workers).map(_play_task, tasks)
+
+    seats = [PlayerTally(f"Player {i + 1}", name) for i, name in enumerate(strategies)]
+    tied_games = 0
+    for wins, ties, histograms, shared in results:
+        for seat, w, t, histogram in zip(seats, wins, ties, histograms):
+            seat.wins += w
+            seat.ties += t
+            seat.scores.add_histogram(histogram)
+        tied_games += shared
+
+    return {
+        "n_games": games,
+        "rounds": rounds,
+        "seed": seed,
+        "rules": rules.to_dict(),
+        "tie_rate": tied_games / games,
+        "players": [seat.to_dict(games) for seat in seats],
+    }
+
+
+def main():
+    """CLI for headless tournaments"""
+    parser = argparse.ArgumentParser(description="U-Boat strategy tournament")
+    parser.add_argument(
+        "--games", type=int, default=100000, help="Games to play (default: 100000)"
+    )
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        default=["optimal", "random", "adaptive"],
+        help=f"One seat per strategy: {', '.join(STRATEGIES)} or fixed:K",
+    )
+    parser.add_argument(
+        "--rounds", type=int, default=ROUNDS, help="Rounds per game (default: 5)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Worker processes (default: 1)"
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Reproducible seed")
+    parser.add_argument("--output", default=None, help="Also save results as JSON")
+    add_rules_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        result = run_tournament(
+            args.games,
+            args.strategies,
+            args.rounds,
+            args.seed,
+            args.workers,
+            rules_from_args(args),
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"\n{'='*60}")
+    print(f"TOURNAMENT: {result['n_games']:,} games of {result['rounds']} rounds")
+    print(f"{'='*60}")
+    print(f"{'Seat':<10} {'Strategy':<12} {'Win':>8} {'Tie':>8} {'Mean':>8} {'Std':>7}")
+    print(f"{'-'*60}")
+    players: List[dict] = result["players"]
+    for p in players:
+        print(
+            f"{p['name']:<10} {p['strategy']:<12} {p['win_probability']:>8.2%} "
+            f"{p['tie_probability']:>8.2%} {p['mean_score']:>8.3f} {p['std_dev']:>7.3f}"
+        )
+    print(f"\nTied top score: {result['tie_rate']:.2%} of games\n")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""Variance-reduction sampling: common random numbers and stratification"""
+
+import argparse
+import itertools
+from functools import partial
+from typing import Callable, Dict, List, Sequence
+
+from .board import popcount
+from .core import calculate_score
+from .rng import make_rng
+from .rules import STANDARD_RULES, GameRules, add_rules_arguments, rules_from_args
+
+# A rule variant plays one sonar search from a roll source and returns hits
+Variant = Callable[[Callable[[], int]], int]
+
+
+def no_reroll_search(next_roll: Callable[[], int], rolls: int = 5) -> int:
+    """`rolls` straight rolls, repeated squares count once (core rules)"""
+    mask = 0
+    for _ in range(rolls):
+        mask |= 1 << next_roll()
+    return popcount(mask)
+
+
+def reroll_search(next_roll: Callable[[], int], rolls: int = 5) -> int:
+    """Re-roll squares already hit until `rolls` new squares are found (CLI)"""
+    mask = 0
+    for _ in range(rolls):
+        while True:
+            bit = 1 << next_roll()
+            if not mask & bit:
+                mask |= bit
+                break
+    return popcount(mask)
+
+
+def rule_variants(rules: GameRules = None) -> Dict[str, Variant]:
+    """
+    The variants playable under rules' board and rolls.
+
+    "reroll" is left out when there are more rolls than squares, since it
+    could never find that many new squares.
+    """
+    rules = rules or STANDARD_RULES
+    variants = {"no_reroll": partial(no_reroll_search, rolls=rules.rolls)}
+    if rules.rolls <= rules.squares:
+        variants["reroll"] = partial(reroll_search, rolls=rules.rolls)
+    return variants
+
+
+VARIANTS: Dict[str, Variant] = rule_variants(STANDARD_RULES)
+
+
+class RollTape:
+    """
+    Lazily drawn sequence of rolls that several readers replay in order.
+
+    Every variant of a game reads the same tape from the start, so they see
+    identical rolls for as long as they consume them (common random numbers).
+    """
+
+    __slots__ = ("rolls", "squares", "_randint")
+
+    def __init__(self, rng, squares: int = 6):
+        self.rolls: List[int] = []
+        self.squares = squares
+        self._randint = rng.randint
+
+    def reader(self) -> Callable[[], int]:
+        rolls = self.rolls
+        position = itertools.count()
+
+        def next_roll() -> int:
+            i = next(position)
+            if i == len(rolls):
+                rolls.append(self._randint(1, self.squares))
+            return rolls[i]
+
+        return next_roll
+
+
+def _resolve(variants: Sequence, rules: GameRules) -> Dict[str, Variant]:
+    available = rule_variants(rules)
+    if not variants:
+        return available
+    unknown = [v for v in variants if v not in available]
+    if unknown:
+        raise ValueError(
+            f"variants {unknown} not playable; choose from {list(available)}"
+        )
+    return {v: available[v] for v in variants}
+
+
+def _outcome(variant: Variant, next_roll, prediction, rules: GameRules) -> int:
+    hits = variant(next_roll)
+    return hits if prediction is None else calculate_score(prediction, hits, rules)
+
+
+def _mean_var(total: int, total_sq: int, n: int):
+    mean = total / n
+    return mean, max(total_sq / n - mean * mean, 0.0)
+
+
+def paired_comparison(
+    n: int,
+    variants: Sequence[str] = None,
+    seed: int = None,
+    prediction: int = None,
+    rng_backend: str = "python",
+    rules: GameRules = None,
+) -> dict:
+    """
+    Compare rule variants on the same random stream (common random numbers).
+
+    Each game draws one tape of rolls that every variant replays, so the
+    difference between variants is measured without the noise of separate
+    samples.
+
+    Args:
+        n: Number of paired games
+        variants: Names from rule_variants(rules) (default: all); the first
+            is the baseline
+        seed: Make the comparison reproducible
+        prediction: Compare points scored by this prediction instead of hits
+        rng_backend: Generator from uboat_game.rng.BACKENDS
+        rules: Board, rolls and points table (default: the standard game);
+            rules.reroll is not used, the variants set the re-roll rule
+
+    Returns:
+        Per-variant means and standard errors, and per variant the difference
+        to the baseline with its paired standard error, the standard error
+        independent samples would give, and the resulting variance reduction
+    """
+    rules = rules or STANDARD_RULES
+    chosen = _resolve(variants, rules)
+    names = list(chosen)
+    baseline = names[0]
+    rng = make_rng(seed, rng_backend)
+
+    sums = dict.fromkeys(names, 0)
+    sums_sq = dict.fromkeys(names, 0)
+    diff_sums = dict.fromkeys(names[1:], 0)
+    diff_sums_sq = dict.fromkeys(names[1:], 0)
+
+    for _ in range(n):
+        tape = RollTape(rng, rules.squares)
+        values = {
+            name: _outcome(variant, tape.reader(), prediction, rules)
+            for name, variant in chosen.items()
+        }
+        for name, value in values.items():
+            sums[name] += value
+            sums_sq[name] += value * value
+        for name in names[1:]:
+            d = values[name] - values[baseline]
+            diff_sums[name] += d
+            diff_sums_sq[name] += d * d
+
+    summary = {}
+    for name in names:
+        mean, var = _mean_var(sums[name], sums_sq[name], n)
+        summary[name] = {"mean": mean, "std_error": (var / n) ** 0.5, "variance": var}
+
+    differences = {}
+    for name in names[1:]:
+        mean, var = _mean_var(diff_sums[name], diff_sums_sq[name], n)
+        independent_var = summary[name]["variance"] + summary[baseline]["variance"]
+        differences[name] = {
+            "mean_difference": mean,
+            "paired_std_error": (var / n) ** 0.5,
+            "independent_std_error": (independent_var / n) ** 0.5,
+            "variance_reduction": independent_var / var if var else float("inf"),
+        }
+
+    return {
+        "n_games": n,
+        "metric": "hits" if prediction is None else f"score(prediction={prediction})",
+        "baseline": baseline,
+        "variants": summary,
+        "differences": differences,
+    }
+
+
+def stratified_simulation(
+    n: int,
+    depth: int = 2,
+    variant: str = None,
+    seed: int = None,
+    rng_backend: str = "python",
+    rules: GameRules = None,
+) -> dict:
+    """
+    Stratified sampling over the squares^rolls roll space.
+
+    Games are split evenly across the squares^depth equally likely values of
+    the first `depth` rolls; only the remaining rolls are random. The
+    estimate is the average of the stratum means. With depth = rolls every
+    stratum is a single outcome, so squares^rolls games (7776 in the
+    standard game) give the exact distribution of no_reroll.
+
+    The variant defaults to the re-roll rule of `rules` (default: the
+    standard game).
+
+    Returns:
+        Stratified mean with its standard error, the bucket probabilities,
+        and the standard error plain Monte Carlo would have at the same n
+    """
+    rules = rules or STANDARD_RULES
+    if not 0 <= depth <= rules.rolls:
+        raise ValueError(f"depth must be 0..{rules.rolls}, got {depth}")
+    if variant is None:
+        variant = "reroll" if rules.reroll else "no_reroll"
+    play = _resolve([variant], rules)[variant]
+    squares = rules.squares
+    strata = list(itertools.product(range(1, squares + 1), repeat=depth))
+    per_stratum = max(n // len(strata), 2 if depth < rules.rolls else 1)
+    rng = make_rng(seed, rng_backend)
+    randint = rng.randint
+
+    stratum_means = []
+    stratum_vars = []
+    bucket_sums: Dict[int, float] = {}
+    total_sq = 0
+    for prefix in strata:
+        counts: Dict[int, int] = {}
+        for _ in range(per_stratum):
+            queue = iter(prefix)
+            hits = play(lambda: next(queue, None) or randint(1, squares))
+            counts[hits] = counts.get(hits, 0) + 1
+        total = sum(k * c for k, c in counts.items())
+        square = sum(k * k * c for k, c in counts.items())
+        total_sq += square
+        mean, var = _mean_var(total, square, per_stratum)
+        stratum_means.append(mean)
+        # Unbiased within-stratum variance for the standard error
+        stratum_vars.append(var * per_stratum / max(per_stratum - 1, 1))
+        for k, c in counts.items():
+            bucket_sums[k] = bucket_sums.get(k, 0.0) + c / per_stratum
+
+    h = len(strata)
+    games = h * per_stratum
+    mean = sum(stratum_means) / h
+    std_error = (sum(stratum_vars) / per_stratum) ** 0.5 / h
+    _, pooled_var = _mean_var(mean * games, total_sq, games)
+    plain_std_error = (pooled_var / games) ** 0.5
+
+    return {
+        "n_games": games,
+        "strata": h,
+        "games_per_stratum": per_stratum,
+        "mean_hits": mean,
+        "std_error": std_error,
+        "plain_monte_carlo_std_error": plain_std_error,
+        "variance_reduction": (
+            (plain_std_error / std_error) ** 2 if std_error else float("inf")
+        ),
+        "probabilities": {k: s / h for k, s in sorted(bucket_sums.items())},
+    }
+
+
+def main():
+    """CLI for paired and stratified variance-reduction runs"""
+    parser = argparse.ArgumentParser(description="U-Boat variance-reduction runs")
+    parser.add_argument("--runs", type=int, default=10000, help="Number of games")
+    parser.add_argument("--seed", type=int, default=None, help="Reproducible seed")
+    parser.add_argument(
+        "--stratify",
+        type=int,
+        default=None,
+        metavar="DEPTH",
+        help="Stratify on the first DEPTH rolls instead of a paired comparison",
+    )
+    parser.add_argument(
+        "--prediction",
+        type=int,
+        default=None,
+        help="Compare points for this prediction instead of hits",
+    )
+    add_rules_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        rules = rules_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.reroll and args.stratify is None:
+        parser.error("--reroll only applies to --stratify; pairs play both rules")
+
+    if args.stratify is not None:
+        try:
+            result = stratified_simulation(
+                args.runs, args.stratify, seed=args.seed, rules=rules
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"\nStratified ({result['strata']} strata, {result['n_games']:,} games)")
+        print(f"Mean hits: {result['mean_hits']:.5f} ± {result['std_error']:.5f}")
+        print(
+            f"Plain Monte Carlo std error: {result['plain_monte_carlo_std_error']:.5f}"
+        )
+        print(f"Variance reduction: {result['variance_reduction']:.1f}x\n")
+        return
+
+    result = paired_comparison(
+        args.runs, seed=args.seed, prediction=args.prediction, rules=rules
+    )
+    print(f"\nPaired comparison of {result['metric']} ({result['n_games']:,} games)")
+    for name, row in result["variants"].items():
+        print(f"  {name:<10} {row['mean']:.5f} ± {row['std_error']:.5f}")
+    for name, row in result["differences"].items():
+        print(
+            f"  {name} - {result['baseline']}: {row['mean_difference']:+.5f} "
+            f"± {row['paired_std_error']:.5f} "
+            f"(independent: ± {row['independent_std_error']:.5f})"
+        )
+    print()
+
+
+if __name__ == "__main__":
+    main()
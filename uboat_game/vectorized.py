@@ -0,0 +1,148 @@
+"""Vectorized NumPy batch engine for Monte Carlo simulation"""
+
+from typing import Iterator, Optional, Tuple
+
+from .rng import as_numpy_generator
+from .rules import STANDARD_RULES, GameRules
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Games simulated per chunk: (chunk, 5) uint8 rolls stay well under 2 MB
+DEFAULT_CHUNK_SIZE = 1 << 18
+
+SQUARES = 6
+ROLLS = 5
+
+
+def _require_numpy():
+    if not NUMPY_AVAILABLE:
+        raise ImportError("numpy not installed")
+
+
+def count_unique_per_row(rolls: "np.ndarray", squares: int = SQUARES) -> "np.ndarray":
+    """
+    Count distinct values in each row of a 2D array of 0-based squares.
+
+    Each roll is turned into a one-bit mask, the masks of a row are OR-ed
+    together and the set bits are counted with a lookup table. This is the
+    array form of marking squares on the board and summing the hits.
+
+    Boards of up to 64 squares use a uint64 mask per game. Larger boards
+    sort each row and count the value changes, which costs O(r log r) per
+    game of r rolls however many squares there are.
+    """
+    if squares <= 8:
+        masks = np.bitwise_or.reduce(np.left_shift(np.uint8(1), rolls), axis=1)
+        return _POPCOUNT_U8[masks]
+    if squares <= 64:
+        bits = np.left_shift(np.uint64(1), rolls.astype(np.uint64))
+        masks = np.bitwise_or.reduce(bits, axis=1)
+        per_byte = _POPCOUNT_U8[masks.view(np.uint8).reshape(-1, 8)]
+        return per_byte.sum(axis=1, dtype=np.uint8)
+    ordered = np.sort(rolls, axis=1)
+    changes = np.count_nonzero(ordered[:, 1:] != ordered[:, :-1], axis=1)
+    return (changes + 1).astype(np.uint32)
+
+
+def _roll_dtype(squares: int):
+    """Smallest unsigned dtype that holds 0-based square numbers"""
+    if squares <= 1 << 8:
+        return np.uint8
+    if squares <= 1 << 16:
+        return np.uint16
+    return np.uint32
+
+
+def iter_game_batches(
+    n: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    rng=None,
+    rules: GameRules = None,
+    with_rolls: bool = False,
+) -> Iterator[Tuple["np.ndarray", Optional["np.ndarray"]]]:
+    """
+    Yield (hits, rolls) for n games, at most chunk_size games at a time.
+
+    Args:
+        n: Number of games to simulate
+        chunk_size: Maximum games drawn per chunk (scaled down for rules with
+            more than 5 rolls, so a chunk's roll array stays the same size)
+        rng: numpy Generator or any uboat_game.rng generator
+            (default: fresh unseeded PCG64)
+        rules: Game rules (default: the standard game)
+        with_rolls: Also yield the (games, rolls) array of 0-based squares
+            rolled; None otherwise
+
+    Yields:
+        Arrays of hit counts (1-5 for the standard game) and the rolls
+    """
+    _require_numpy()
+    rules = rules or STANDARD_RULES
+    if with_rolls and rules.reroll:
+        raise ValueError("roll sequences are not fixed-length with re-rolls")
+    rng = as_numpy_generator(rng)
+    chunk_size = max(1, chunk_size * ROLLS // max(rules.rolls, ROLLS))
+    dtype = _roll_dtype(rules.squares)
+
+    remaining = n
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        if rules.certain_hits is not None:
+            yield np.full(size, rules.certain_hits, dtype=np.uint32), None
+        else:
+            rolls = rng.integers(
+                0, rules.squares, size=(size, rules.rolls), dtype=dtype
+            )
+            hits = count_unique_per_row(rolls, rules.squares)
+            yield hits, rolls if with_rolls else None
+        remaining -= size
+
+
+def iter_hit_batches(
+    n: int, chunk_size: int = DEFAULT_CHUNK_SIZE, rng=None, rules: GameRules = None
+) -> Iterator["np.ndarray"]:
+    """Per-game hit counts for n games, chunk by chunk (see iter_game_batches)"""
+    for hits, _ in iter_game_batches(n, chunk_size, rng, rules):
+        yield hits
+
+
+def simulate_histogram(
+    n: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    rng=None,
+    keep_raw: bool = False,
+    rules: GameRules = None,
+):
+    """
+    Simulate n games and count how often each hit total occurs.
+
+    Returns:
+        (histogram, raw_results): histogram[k] = games with k hits
+        (k = 0..rules.max_hits), raw_results is the list of per-game hits or
+        None unless keep_raw
+    """
+    _require_numpy()
+    rules = rules or STANDARD_RULES
+    size = rules.max_hits + 1
+    histogram = np.zeros(size, dtype=np.int64)
+    batches = [] if keep_raw else None
+
+    for hits in iter_hit_batches(n, chunk_size, rng, rules):
+        histogram += np.bincount(hits, minlength=size)
+        if keep_raw:
+            batches.append(hits)
+
+    raw_results = None
+    if keep_raw:
+        raw_results = np.concatenate(batches).tolist() if batches else []
+
+    return histogram.tolist(), raw_results
+
+
+if NUMPY_AVAILABLE:
+    _POPCOUNT_U8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
@@ -1,19 +1,37 @@
 """Visualization utilities using matplotlib"""
 
-try:
-    import matplotlib.pyplot as plt
-    import matplotlib
+import importlib.util
 
-    matplotlib.use("Agg")  # Non-GUI backend
-    MATPLOTLIB_AVAILABLE = True
-except ImportError:
-    MATPLOTLIB_AVAILABLE = False
+# pyplot takes longer to import than the rest of the package together, so it
+# is only loaded once a chart is actually drawn
+MATPLOTLIB_AVAILABLE = importlib.util.find_spec("matplotlib") is not None
 
 
-def plot_hit_distribution(data: dict, filename: str = "hit_distribution.png"):
-    """Bar chart of hit frequency"""
+def _pyplot():
+    """matplotlib.pyplot on the non-GUI backend, imported on first use"""
     if not MATPLOTLIB_AVAILABLE:
         raise ImportError("matplotlib not installed")
+    import matplotlib
+
+    matplotlib.use("Agg")  # Non-GUI backend
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+# Label every bar on the x axis up to this many; beyond, matplotlib picks
+MAX_TICKS = 30
+
+# Hit counts less likely than this in theory are left out of the
+# comparison unless they occurred, as in the simulator's table
+MIN_PROBABILITY = 5e-5
+
+
+def plot_hit_distribution(
+    data: dict, filename="hit_distribution.png", fmt: str = None, dpi: int = 150
+):
+    """Bar chart of hit frequency, saved to a path or binary file object"""
+    plt = _pyplot()
 
     hits = sorted(data["hit_distribution"].keys())
     counts = [data["hit_distribution"][h] for h in hits]
@@ -23,7 +41,8 @@ def plot_hit_distribution(data: dict, filename: str = "hit_distribution.png"):
     plt.xlabel("Number of Hits", fontsize=12)
     plt.ylabel("Frequency", fontsize=12)
     plt.title(f'Hit Distribution ({data["n_simulations"]:,} simulations)', fontsize=14)
-    plt.xticks(range(1, 7))
+    if len(hits) <= MAX_TICKS:
+        plt.xticks(hits)
     plt.grid(axis="y", alpha=0.3)
 
     # Add mean line
@@ -37,20 +56,30 @@ def plot_hit_distribution(data: dict, filename: str = "hit_distribution.png"):
     plt.legend()
 
     plt.tight_layout()
-    plt.savefig(filename, dpi=150)
+    plt.savefig(filename, format=fmt, dpi=dpi)
     plt.close()
 
 
-def plot_comparison(comparison: dict, filename: str = "probability_comparison.png"):
-    """Side-by-side comparison chart"""
-    if not MATPLOTLIB_AVAILABLE:
-        raise ImportError("matplotlib not installed")
+def plot_comparison(
+    comparison: dict,
+    filename="probability_comparison.png",
+    fmt: str = None,
+    dpi: int = 150,
+):
+    """Side-by-side comparison chart, saved to a path or binary file object"""
+    plt = _pyplot()
 
-    hits = list(range(1, 7))
-    exp_probs = [comparison["experimental"].get(h, 0) for h in hits]
-    theo_probs = [comparison["theoretical"].get(h, 0) for h in hits]
+    experimental, theoretical = comparison["experimental"], comparison["theoretical"]
+    hits = [
+        h
+        for h in sorted(set(experimental) | set(theoretical))
+        if h > 0
+        and (experimental.get(h, 0) or theoretical.get(h, 0) >= MIN_PROBABILITY)
+    ]
+    exp_probs = [experimental.get(h, 0) for h in hits]
+    theo_probs = [theoretical.get(h, 0) for h in hits]
 
-    x = range(1, 7)
+    x = hits
     width = 0.35
 
     plt.figure(figsize=(12, 6))
@@ -77,10 +106,11 @@ def plot_comparison(comparison: dict, filename: str = "probability_comparison.pn
         f'Experimental vs Theoretical Probabilities ({comparison["n_simulations"]:,} sims)',
         fontsize=14,
     )
-    plt.xticks(x)
+    if len(x) <= MAX_TICKS:
+        plt.xticks(x)
     plt.legend()
     plt.grid(axis="y", alpha=0.3)
 
     plt.tight_layout()
-    plt.savefig(filename, dpi=150)
+    plt.savefig(filename, format=fmt, dpi=dpi)
     plt.close()
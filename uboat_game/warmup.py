@@ -0,0 +1,45 @@
+"""Start-up warm-up so the first request does not pay one-off costs"""
+
+import time
+from typing import Dict
+
+from .core import resolve_engine, run_simulations
+from .parallel import warm_pool
+from .rules import STANDARD_RULES
+from .strategy import score_table
+from .theory import theoretical_probabilities
+
+
+def warm_up(workers: int = 0) -> Dict[str, float]:
+    """
+    Load the simulation engines, fill the standard-game caches and start
+    the process pool.
+
+    A fresh process otherwise pays for lazy imports (numpy, the vectorized
+    engine), generator set-up and the exact-distribution caches on its first
+    request, and for spawning pool processes on its first parallel one.
+
+    Args:
+        workers: Size of the process pool to start (0: none)
+
+    Returns:
+        Seconds spent per step
+    """
+    timings = {}
+
+    started = time.perf_counter()
+    engines = {"python", resolve_engine("auto")}
+    for engine in sorted(engines):
+        run_simulations(1000, seed=0, engine=engine)
+        run_simulations(1000, engine=engine)
+    timings["engines"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    theoretical_probabilities(STANDARD_RULES.squares, STANDARD_RULES.rolls)
+    score_table(STANDARD_RULES)
+    timings["theory"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    warm_pool(workers, resolve_engine("auto"))
+    timings["pool"] = time.perf_counter() - started
+    return timings
@@ -134,6 +134,148 @@ def test_matplotlib_plotting():
         return False
 
 
+# Cold import of the simulator CLI, in seconds. numpy accounts for most of
+# it; pulling in matplotlib would roughly quadruple it.
+IMPORT_TIME_BUDGET = 1.0
+
+
+def test_import_time():
+    """Startup: plotting is only loaded when a chart is drawn"""
+    print("\n✅ TEST 7: Import time budget")
+    import subprocess
+
+    # -X importtime reports cumulative microseconds per module on stderr
+    check = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import sys, uboat_game.simulator; print('matplotlib' in sys.modules)",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert check.stdout.strip() == "False", "Importing the simulator loads matplotlib"
+
+    seconds = None
+    for line in check.stderr.splitlines():
+        if line.rstrip().endswith("| uboat_game.simulator"):
+            seconds = int(line.split("|")[1]) / 1e6
+    assert seconds is not None, "No -X importtime line for uboat_game.simulator"
+    assert (
+        seconds < IMPORT_TIME_BUDGET
+    ), f"Import took {seconds:.3f}s, budget {IMPORT_TIME_BUDGET}s"
+
+    print(f"   uboat_game.simulator imports in {seconds:.3f}s")
+    print(f"   Budget: {IMPORT_TIME_BUDGET}s, matplotlib not loaded: ✓")
+    return True
+
+
+def test_checkpoint_resume():
+    """Reproducibility: a resumed checkpointed run matches an uninterrupted one"""
+    print("\n✅ TEST 8: Checkpoint resume")
+    import os
+    import tempfile
+    from uboat_game.checkpoint import run_checkpointed
+    from uboat_game.parallel import BLOCK_SIZE
+    from uboat_game.progress import Throttle
+
+    class Interrupted(Exception):
+        pass
+
+    def interrupt(done, total):
+        if done >= BLOCK_SIZE:
+            raise Interrupted
+
+    n, seed = 3 * BLOCK_SIZE, 2024
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "run.ckpt")
+        try:
+            # Interval 0 forwards every update, so the run stops after one block
+            run_checkpointed(n, path, seed=seed, progress=Throttle(interrupt, 0))
+        except Interrupted:
+            pass
+        assert os.path.exists(path), "No checkpoint left by the interrupted run"
+        resumed = run_checkpointed(n, path, seed=seed, resume=True)
+    full = run_simulations(n, seed=seed)
+
+    assert resumed["resumed_from"] == BLOCK_SIZE, "Resume did not skip done games"
+    assert (
+        resumed["hit_distribution"] == full["hit_distribution"]
+    ), "Resumed run differs from the full run"
+    print(f"   Interrupted after {resumed['resumed_from']:,} of {n:,} games")
+    print(f"   Resumed hit distribution equals the full run: ✓")
+    return True
+
+
+def test_theory_table():
+    """Theory: the exact distribution of the standard game"""
+    print("\n✅ TEST 9: Theoretical probabilities")
+    from fractions import Fraction
+    from uboat_game.theory import occupancy_distribution
+
+    exact = occupancy_distribution(6, 5, exact=True)
+    assert exact[5] == Fraction(720, 7776), f"P(5 hits) = {exact[5]}, not 720/7776"
+    assert exact[4] == Fraction(3600, 7776), f"P(4 hits) = {exact[4]}, not 3600/7776"
+    assert sum(exact) == 1, "Probabilities do not sum to 1"
+
+    print(f"   P(4 hits) = 3600/7776 = {float(exact[4]):.4f}")
+    print(f"   P(5 hits) = 720/7776 = {float(exact[5]):.4f}")
+    return True
+
+
+def test_worker_invariance():
+    """Reproducibility: a seeded run gives the same result on any worker count"""
+    print("\n✅ TEST 10: Worker-count invariance")
+    from uboat_game.parallel import BLOCK_SIZE
+
+    n, seed = 2 * BLOCK_SIZE + 123, 7
+    single = run_simulations(n, seed=seed, workers=1)
+    parallel = run_simulations(n, seed=seed, workers=2)
+
+    assert (
+        single["hit_distribution"] == parallel["hit_distribution"]
+    ), "1 and 2 workers give different results"
+    print(f"   {n:,} games, seed {seed}: 1 worker == 2 workers ✓")
+    return True
+
+
+def test_cache_single_flight():
+    """Caching: concurrent requests for one key compute it once"""
+    print("\n✅ TEST 11: Result cache single-flight")
+    import threading
+    import time
+    from uboat_game.cache import ResultCache
+
+    cache = ResultCache(maxsize=8, ttl=60)
+    calls = []
+    start = threading.Barrier(8)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return "result"
+
+    results = []
+
+    def request():
+        start.wait()
+        results.append(cache.get_or_compute("key", compute))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1, f"Computed {len(calls)} times for 8 concurrent requests"
+    assert results == ["result"] * 8, "Waiting requests got a different result"
+    print(f"   8 concurrent requests, 1 computation, {cache.coalesced} coalesced ✓")
+    return True
+
+
 def main():
     """Run all verification tests"""
     print("=" * 60)
@@ -147,6 +289,11 @@ def main():
         test_result_tracking,
         test_result_storage,
         test_matplotlib_plotting,
+        test_import_time,
+        test_checkpoint_resume,
+        test_theory_table,
+        test_worker_invariance,
+        test_cache_single_flight,
     ]
 
     results = []